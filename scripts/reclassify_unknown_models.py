@@ -5,37 +5,44 @@ from __future__ import annotations
 
 import argparse
 import sqlite3
+from contextlib import closing
 from pathlib import Path
 
 from ai_marketplace_monitor.market_data import MarketDataStore, get_market_data_store
 
 
-def _count_unknown(db_path: Path) -> int:
-    with sqlite3.connect(db_path) as conn:
-        row = conn.execute(
-            """
-            SELECT COUNT(*)
-            FROM listing_observations
-            WHERE COALESCE(detected_model, 'unknown') = 'unknown'
-               OR classification_reason IS NULL
-            """
-        ).fetchone()
-        return int(row[0] if row else 0)
+def _count_unknown(conn: sqlite3.Connection) -> int:
+    row = conn.execute(
+        """
+        SELECT COUNT(*)
+        FROM listing_observations
+        WHERE COALESCE(detected_model, 'unknown') = 'unknown'
+           OR classification_reason IS NULL
+        """
+    ).fetchone()
+    return int(row[0] if row else 0)
 
 
-def _top_models(db_path: Path, limit: int = 20) -> list[tuple[str, int]]:
-    with sqlite3.connect(db_path) as conn:
-        rows = conn.execute(
-            """
-            SELECT detected_model, COUNT(*) AS cnt
-            FROM listing_observations
-            GROUP BY detected_model
-            ORDER BY cnt DESC, detected_model ASC
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
-        return [(str(r[0]), int(r[1])) for r in rows]
+def _unknown_and_top_models(
+    conn: sqlite3.Connection, limit: int = 20
+) -> tuple[int, list[tuple[str, int]]]:
+    """Return the unknown-row count and the most frequent models from one table scan."""
+    rows = conn.execute(
+        """
+        SELECT
+            detected_model,
+            COUNT(*) AS cnt,
+            COUNT(*) FILTER (
+                WHERE COALESCE(detected_model, 'unknown') = 'unknown'
+                   OR classification_reason IS NULL
+            ) AS unknown_cnt
+        FROM listing_observations
+        GROUP BY detected_model
+        ORDER BY cnt DESC, detected_model ASC
+        """
+    ).fetchall()
+    unknown = sum(int(r[2]) for r in rows)
+    return unknown, [(str(r[0]), int(r[1])) for r in rows[:limit]]
 
 
 def main() -> None:
@@ -48,6 +55,12 @@ def main() -> None:
         default=None,
         help="Path to market_data.db. Defaults to runtime configured path.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to classify rows. Defaults to 1.",
+    )
     args = parser.parse_args()
 
     if args.db_path is None:
@@ -55,16 +68,20 @@ def main() -> None:
     else:
         store = MarketDataStore(args.db_path.expanduser().resolve())
 
-    before_unknown = _count_unknown(store.db_path)
-    updated = store.reclassify_unknown_rows()
-    after_unknown = _count_unknown(store.db_path)
+    # one reporting connection for all summary queries instead of reconnecting per query
+    with closing(sqlite3.connect(store.db_path)) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        before_unknown = _count_unknown(conn)
+        updated = store.reclassify_unknown_rows(workers=args.workers)
+        after_unknown, top_models = _unknown_and_top_models(conn)
 
     print(f"db_path={store.db_path}")
     print(f"updated_rows={updated}")
     print(f"unknown_before={before_unknown}")
     print(f"unknown_after={after_unknown}")
     print("top_detected_models:")
-    for model, cnt in _top_models(store.db_path):
+    for model, cnt in top_models:
         print(f"  {model}: {cnt}")
 
 
@@ -14,7 +14,7 @@ from playwright.sync_api import Browser, ElementHandle, Locator, Page  # type: i
 from rich.pretty import pretty_repr
 
 from .listing import Listing
-from .market_data import get_market_data_store
+from .market_data import MarketDataStore, get_market_data_store
 from .marketplace import ItemConfig, Marketplace, MarketplaceConfig, WebPage
 from .utils import (
     BaseConfig,
@@ -376,6 +376,43 @@ class FacebookMarketplace(Marketplace):
             tag=CacheType.SENT_MESSAGES.value,
         )
 
+    def _flush_observations(
+        self: "FacebookMarketplace",
+        market_data_store: MarketDataStore,
+        pending_observations: list[tuple[Listing, str, str, str, str]],
+    ) -> int:
+        """Write pending observations in one transaction and return how many were written.
+
+        If the batch fails, each observation is retried on its own so that one bad row does not
+        discard the rest.
+        """
+        if not pending_observations:
+            return 0
+        count = len(pending_observations)
+        try:
+            market_data_store.record_observations(pending_observations)
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            if self.logger:
+                self.logger.debug(
+                    f"""{hilight("[Data]", "fail")} Failed to persist {count} listings in one batch, retrying one by one: {e}"""
+                )
+            count = 0
+            for observation in pending_observations:
+                try:
+                    market_data_store.record_observation(*observation)
+                    count += 1
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    if self.logger:
+                        self.logger.debug(
+                            f"""{hilight("[Data]", "fail")} Failed to persist listing {observation[0].id}: {e}"""
+                        )
+        pending_observations.clear()
+        return count
+
     def send_preset_message(
         self: "FacebookMarketplace",
         listing: Listing,
@@ -684,6 +721,8 @@ class FacebookMarketplace(Marketplace):
         item_config.searched_count += 1
 
         market_data_store = get_market_data_store()
+        # snapshots cached by an earlier pass may be stale if another process wrote the database
+        market_data_store.clear_snapshot_cache()
         market_window_days = (
             item_config.market_price_window_days
             if item_config.market_price_window_days is not None
@@ -811,149 +850,149 @@ class FacebookMarketplace(Marketplace):
                     time.sleep(5)
 
                     counter.increment(CounterItem.SEARCH_PERFORMED, item_config.name)
-                    sold_records = 0
-
-                    # go to each item and get the description if we have not done that before
-                    for listing in found_listings:
-                        # When Facebook returns mixed results for the sold filter, prevent false sold
-                        # observations by honoring in-stock sightings from this same search pass.
-                        if availability != Availability.OUTSTOCK.value:
-                            seen_non_out_ids.add(listing.id)
-                        elif listing.id in seen_non_out_ids:
-                            if self.logger:
-                                self.logger.debug(
-                                    f"""{hilight("[Data]", "info")} Skip sold observation for {listing.id} because it also appeared in non-sold results."""
-                                )
-                            continue
-
-                        cache_key = f"{availability}:{listing.post_url.split('?')[0]}"
-                        if cache_key in found:
-                            continue
-                        if self.keyboard_monitor is not None and self.keyboard_monitor.is_paused():
-                            return
-                        counter.increment(CounterItem.LISTING_EXAMINED, item_config.name)
-                        found[cache_key] = True
-                        # filter by title and location; skip keyword filtering since we do not have description yet.
-                        if not self.check_listing(listing, item_config, description_available=False):
-                            counter.increment(CounterItem.EXCLUDED_LISTING, item_config.name)
-                            continue
-                        details = market_data_store.get_latest_listing_snapshot(
-                            listing.marketplace, listing.id
-                        )
-                        if details is None:
-                            try:
-                                details, from_cache = self.get_listing_details(
-                                    listing.post_url,
-                                    item_config,
-                                    price=listing.price,
-                                    title=listing.title,
-                                )
-                                if not from_cache:
-                                    time.sleep(5)
-                            except KeyboardInterrupt:
-                                raise
-                            except Exception as e:
+                    # Observations are written in batches with one commit. Sold listings are never
+                    # yielded, so a sold pass is flushed once at the end; pending rows are also
+                    # flushed before yielding and in the finally block below, so nothing is lost
+                    # if the caller stops or the search is interrupted.
+                    pending_observations: list[tuple[Listing, str, str, str, str]] = []
+
+                    try:
+                        # go to each item and get the description if we have not done that before
+                        for listing in found_listings:
+                            # When Facebook returns mixed results for the sold filter, prevent false sold
+                            # observations by honoring in-stock sightings from this same search pass.
+                            if availability != Availability.OUTSTOCK.value:
+                                seen_non_out_ids.add(listing.id)
+                            elif listing.id in seen_non_out_ids:
                                 if self.logger:
-                                    self.logger.error(
-                                        f"""{hilight("[Retrieve]", "fail")} Failed to get item details: {e}"""
+                                    self.logger.debug(
+                                        f"""{hilight("[Data]", "info")} Skip sold observation for {listing.id} because it also appeared in non-sold results."""
                                     )
                                 continue
-                        elif self.logger:
-                            self.logger.debug(
-                                f"""{hilight("[Retrieve]", "info")} Reusing cached snapshot for listing {listing.id}; skipping detail-page navigation."""
-                            )
 
-                        # currently we trust the summary title and price more than detailed page.
-                        for attr in ("condition", "seller", "description"):
-                            setattr(listing, attr, getattr(details, attr))
-                        listing.name = item_config.name
-
-                        if self.logger:
-                            self.logger.debug(
-                                f"""{hilight("[Retrieve]", "succ")} New item "{listing.title}" from {listing.post_url} is sold by "{listing.seller}" and with description "{listing.description[:100]}..." """
-                            )
-
-                        # Warn if we never managed to extract a description for keyword-based filtering
-                        if (
-                            (not listing.description or len(listing.description.strip()) == 0)
-                            and item_config.keywords
-                            and len(item_config.keywords) > 0
-                            and self.logger
-                        ):
-                            self.logger.debug(
-                                f"""{hilight("[Error]", "fail")} Failed to extract description for {hilight(listing.title)} at {listing.post_url}. Keyword filtering will only apply to title."""
-                            )
-
-                        # Apply full filtering before persistence to avoid storing skipped listings.
-                        if not self.check_listing(listing, item_config):
-                            counter.increment(CounterItem.EXCLUDED_LISTING, item_config.name)
-                            continue
-
-                        if availability == Availability.OUTSTOCK.value:
-                            market_status = _infer_market_status(
-                                str(getattr(listing, "market_status", "")),
-                                listing.title,
-                                listing.description,
-                                getattr(details, "title", ""),
+                            listing_url = listing.post_url.partition("?")[0]
+                            cache_key = f"{availability}:{listing_url}"
+                            if cache_key in found:
+                                continue
+                            if (
+                                self.keyboard_monitor is not None
+                                and self.keyboard_monitor.is_paused()
+                            ):
+                                return
+                            counter.increment(CounterItem.LISTING_EXAMINED, item_config.name)
+                            found[cache_key] = True
+                            # filter by title and location; skip keyword filtering since we do not have description yet.
+                            if not self.check_listing(
+                                listing, item_config, description_available=False
+                            ):
+                                counter.increment(CounterItem.EXCLUDED_LISTING, item_config.name)
+                                continue
+                            details = market_data_store.get_latest_listing_snapshot(
+                                listing.marketplace, listing.id
                             )
-                            if market_status != "sold":
-                                if self.logger:
-                                    self.logger.debug(
-                                        f"""{hilight("[Data]", "info")} Skip out-of-stock observation for {listing.id}; inferred status={market_status} (no explicit sold marker)."""
+                            if details is None:
+                                try:
+                                    details, from_cache = self.get_listing_details(
+                                        listing.post_url,
+                                        item_config,
+                                        price=listing.price,
+                                        title=listing.title,
                                     )
-                                continue
+                                    if not from_cache:
+                                        time.sleep(5)
+                                except KeyboardInterrupt:
+                                    raise
+                                except Exception as e:
+                                    if self.logger:
+                                        self.logger.error(
+                                            f"""{hilight("[Retrieve]", "fail")} Failed to get item details: {e}"""
+                                        )
+                                    continue
+                            elif self.logger:
+                                self.logger.debug(
+                                    f"""{hilight("[Retrieve]", "info")} Reusing cached snapshot for listing {listing.id}; skipping detail-page navigation."""
+                                )
 
-                        was_seen_out = market_data_store.has_observation(
-                            listing.marketplace, listing.id, availability=Availability.OUTSTOCK.value
-                        )
-                        was_seen_non_out = market_data_store.has_non_out_observation(
-                            listing.marketplace, listing.id
-                        )
+                            # currently we trust the summary title and price more than detailed page.
+                            for attr in ("condition", "seller", "description"):
+                                setattr(listing, attr, getattr(details, attr))
+                            listing.name = item_config.name
 
-                        try:
-                            market_data_store.record_observation(
-                                listing=listing,
-                                item_name=item_config.name,
-                                search_city=city,
-                                search_phrase=search_phrase,
-                                availability=availability,
-                            )
-                            if availability == Availability.OUTSTOCK.value:
-                                sold_records += 1
-                        except KeyboardInterrupt:
-                            raise
-                        except Exception as e:
                             if self.logger:
                                 self.logger.debug(
-                                    f"""{hilight("[Data]", "fail")} Failed to persist listing {listing.id}: {e}"""
+                                    f"""{hilight("[Retrieve]", "succ")} New item "{listing.title}" from {listing.post_url} is sold by "{listing.seller}" and with description "{listing.description[:100]}..." """
                                 )
 
-                        # sold listings are kept in market_data table and are not yielded for notifications.
-                        if availability == Availability.OUTSTOCK.value:
-                            if (not was_seen_out) and was_seen_non_out and self.logger:
-                                self.logger.info(
-                                    f"""{hilight("[Sold]", "info")} {hilight(listing.title)} appears sold at {hilight(listing.price)} ({listing.post_url.split('?')[0]})."""
+                            # Warn if we never managed to extract a description for keyword-based filtering
+                            if (
+                                (not listing.description or len(listing.description.strip()) == 0)
+                                and item_config.keywords
+                                and len(item_config.keywords) > 0
+                                and self.logger
+                            ):
+                                self.logger.debug(
+                                    f"""{hilight("[Error]", "fail")} Failed to extract description for {hilight(listing.title)} at {listing.post_url}. Keyword filtering will only apply to title."""
                                 )
-                            continue
 
-                        if auto_send_message:
-                            if self.was_message_sent(listing.id):
-                                if self.logger:
-                                    self.logger.debug(
-                                        f"""{hilight("[Message]", "info")} Skip messaging listing {listing.id}; preset message already sent before."""
-                                    )
-                            else:
-                                sent = self.send_preset_message(
-                                    listing=listing,
-                                    preset_message=message_preset,
-                                    send_delay_seconds=message_send_delay,
+                            # Apply full filtering before persistence to avoid storing skipped listings.
+                            if not self.check_listing(listing, item_config):
+                                counter.increment(CounterItem.EXCLUDED_LISTING, item_config.name)
+                                continue
+
+                            if availability == Availability.OUTSTOCK.value:
+                                market_status = _infer_market_status(
+                                    str(getattr(listing, "market_status", "")),
+                                    listing.title,
+                                    listing.description,
+                                    getattr(details, "title", ""),
                                 )
-                                if sent:
-                                    self.mark_message_sent(listing, message_preset)
+                                if market_status != "sold":
+                                    if self.logger:
+                                        self.logger.debug(
+                                            f"""{hilight("[Data]", "info")} Skip out-of-stock observation for {listing.id}; inferred status={market_status} (no explicit sold marker)."""
+                                        )
+                                    continue
+
+                            was_seen_out, was_seen_non_out = market_data_store.observation_flags(
+                                listing.marketplace, listing.id
+                            )
 
-                        yield listing
+                            pending_observations.append(
+                                (listing, item_config.name, city, search_phrase, availability)
+                            )
+
+                            # sold listings are kept in market_data table and are not yielded for notifications.
+                            if availability == Availability.OUTSTOCK.value:
+                                if (not was_seen_out) and was_seen_non_out and self.logger:
+                                    self.logger.info(
+                                        f"""{hilight("[Sold]", "info")} {hilight(listing.title)} appears sold at {hilight(listing.price)} ({listing_url})."""
+                                    )
+                                continue
+
+                            self._flush_observations(market_data_store, pending_observations)
+                            if auto_send_message:
+                                if self.was_message_sent(listing.id):
+                                    if self.logger:
+                                        self.logger.debug(
+                                            f"""{hilight("[Message]", "info")} Skip messaging listing {listing.id}; preset message already sent before."""
+                                        )
+                                else:
+                                    sent = self.send_preset_message(
+                                        listing=listing,
+                                        preset_message=message_preset,
+                                        send_delay_seconds=message_send_delay,
+                                    )
+                                    if sent:
+                                        self.mark_message_sent(listing, message_preset)
+
+                            yield listing
+                    finally:
+                        # also runs when the caller stops iterating or the search is interrupted
+                        recorded = self._flush_observations(
+                            market_data_store, pending_observations
+                        )
 
-                    if availability == Availability.OUTSTOCK.value and sold_records > 0:
+                    if availability == Availability.OUTSTOCK.value and recorded > 0:
                         try:
                             sample_size, msrp_estimate, msrp_currency = (
                                 market_data_store.refresh_market_price(
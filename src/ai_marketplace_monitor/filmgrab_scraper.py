@@ -3,11 +3,16 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import html
 import json
+import os
 import random
 import re
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from html.parser import HTMLParser
 from pathlib import Path
@@ -15,87 +20,134 @@ from typing import Any
 from urllib.parse import urljoin, urlsplit, urlunsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 
 DEFAULT_BASE_URL = "https://film-grab.com"
 DEFAULT_DIRECTOR_SLUG = "wong-kar-wai"
 DEFAULT_OUTPUT_ROOT = Path("downloads/filmgrab")
 DEFAULT_CATEGORY_URL = f"{DEFAULT_BASE_URL}/category/{DEFAULT_DIRECTOR_SLUG}/"
 DEFAULT_OUTPUT_DIR = DEFAULT_OUTPUT_ROOT / DEFAULT_DIRECTOR_SLUG
-IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif"}
-
-ABS_MEDIA_URL_RE = re.compile(
-    r"https?://film-grab\.com/wp-content/uploads/photo-gallery/[^\s\"'<>]+",
-    re.IGNORECASE,
-)
-REL_MEDIA_URL_RE = re.compile(
-    r"/wp-content/uploads/photo-gallery/[^\s\"'<>]+",
+DEFAULT_MAX_WORKERS = 4
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif")
+_ABSOLUTE_PREFIXES = ("https://", "http://")
+
+# absolute or site-relative gallery URL; relative matches are resolved against base_url later
+MEDIA_URL_RE = re.compile(
+    r"(?:https?://film-grab\.com)?/wp-content/uploads/photo-gallery/[^\s\"'<>]+",
     re.IGNORECASE,
 )
 POST_URL_RE = re.compile(r"^/\d{4}/\d{2}/\d{2}/[^/]+/?$")
+_H1_RE = re.compile(r"<h1[^>]*>(.*?)</h1>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SLUG_RE = re.compile(r"[^a-zA-Z0-9]+")
+
 
+class _PageParser(HTMLParser):
+    """Collect anchors, link tags, and candidate media URLs in a single pass.
 
-class _LinkParser(HTMLParser):
-    """Collect anchor and link tags with attributes."""
+    Media URLs come from URL attributes of ``a``/``img``/``source`` tags plus any
+    gallery URL mentioned in other attribute values, text (e.g. inline scripts), or comments.
+    """
+
+    MEDIA_TAGS = frozenset({"a", "img", "source"})
+    RAW_TEXT_TAGS = frozenset({"script", "style"})
+    URL_ATTRS = frozenset(
+        {
+            "href",
+            "src",
+            "data-src",
+            "data-original",
+            "data-lazy-src",
+            "data-image-url",
+            "data-large-file",
+            "data-large_image",
+        }
+    )
 
     def __init__(self) -> None:
         super().__init__()
         self.anchors: list[dict[str, str]] = []
         self.links: list[dict[str, str]] = []
+        # kept apart so media_urls can list absolute mentions first, then relative ones,
+        # then tag attributes, which is the order file names have always been numbered in
+        self._absolute_urls: list[str] = []
+        self._relative_urls: list[str] = []
+        self._attr_urls: list[str] = []
+        self._in_raw_text = False
 
-    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
-        attr_map = {key.lower(): value for key, value in attrs if key and value is not None}
-        lower_tag = tag.lower()
-        if lower_tag == "a":
-            self.anchors.append(attr_map)
-        elif lower_tag == "link":
-            self.links.append(attr_map)
-
-
-class _MediaParser(HTMLParser):
-    """Collect candidate media URLs from HTML attributes."""
-
-    URL_ATTRS = {
-        "href",
-        "src",
-        "data-src",
-        "data-original",
-        "data-lazy-src",
-        "data-image-url",
-        "data-large-file",
-        "data-large_image",
-    }
-
-    def __init__(self) -> None:
-        super().__init__()
-        self.urls: list[str] = []
+    @property
+    def media_urls(self) -> list[str]:
+        return self._absolute_urls + self._relative_urls + self._attr_urls
 
     def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
-        lower_tag = tag.lower()
-        if lower_tag not in {"a", "img", "source"}:
+        # HTMLParser already lower-cases tag and attribute names
+        if tag in self.RAW_TEXT_TAGS:
+            self._in_raw_text = True
+        if not attrs:
             return
+        if tag == "a" or tag == "link":
+            attr_map = {key: value for key, value in attrs if value is not None}
+            (self.anchors if tag == "a" else self.links).append(attr_map)
+        is_media_tag = tag in self.MEDIA_TAGS
         for key, value in attrs:
-            if key is None or value is None:
+            if value is None:
                 continue
-            if key.lower() in self.URL_ATTRS:
-                self.urls.append(value)
+            if is_media_tag and key in self.URL_ATTRS:
+                self._attr_urls.append(value)
+            self._scan_media_urls(value)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.RAW_TEXT_TAGS:
+            self._in_raw_text = False
+
+    def handle_data(self, data: str) -> None:
+        # ordinary text is already unescaped by HTMLParser; only script/style bodies are raw
+        if self._in_raw_text and "&" in data:
+            data = html.unescape(data)
+        self._scan_media_urls(data)
+
+    def handle_comment(self, data: str) -> None:
+        self._scan_media_urls(html.unescape(data) if "&" in data else data)
+
+    def _scan_media_urls(self, text: str) -> None:
+        for match in MEDIA_URL_RE.findall(text):
+            # MEDIA_URL_RE is case-insensitive, so the scheme may be upper-case
+            if match[:8].lower().startswith(_ABSOLUTE_PREFIXES):
+                self._absolute_urls.append(match)
+            else:
+                self._relative_urls.append(match)
+
+
+def _parse_page(page_html: str) -> _PageParser:
+    parser = _PageParser()
+    parser.feed(page_html)
+    return parser
 
 
 def _dedupe_preserve_order(urls: list[str]) -> list[str]:
-    seen: set[str] = set()
-    ordered: list[str] = []
-    for url in urls:
-        if url in seen:
-            continue
-        seen.add(url)
-        ordered.append(url)
-    return ordered
+    # dicts keep insertion order, so this drops repeats while keeping first occurrences
+    return list(dict.fromkeys(urls))
 
 
-def _normalize_url(url: str, base_url: str) -> str:
-    absolute = urljoin(base_url, html.unescape(url))
-    parts = urlsplit(absolute)
+def _normalize_parts(url: str, base_url: str) -> tuple[str, str, str]:
+    """Return the normalized URL with its lower-cased host and path from a single parse."""
+
+    if "&" in url:
+        url = html.unescape(url)
+    # Absolute http(s) URLs come back from urljoin unchanged, so skip re-parsing the base.
+    parts = urlsplit(url if url.startswith(_ABSOLUTE_PREFIXES) else urljoin(base_url, url))
     clean_path = parts.path or "/"
-    return urlunsplit((parts.scheme, parts.netloc, clean_path, "", ""))
+    if parts.netloc:
+        # Query and fragment are always dropped, so a plain join matches urlunsplit here.
+        normalized = f"{parts.scheme}://{parts.netloc}{clean_path}"
+    else:
+        normalized = urlunsplit((parts.scheme, parts.netloc, clean_path, "", ""))
+    return normalized, parts.netloc.lower(), clean_path
+
+
+def _normalize_url(url: str, base_url: str) -> str:
+    return _normalize_parts(url, base_url)[0]
 
 
 def _host(url: str) -> str:
@@ -106,9 +158,8 @@ def _path(url: str) -> str:
     return urlsplit(url).path
 
 
-def _is_image_url(url: str) -> bool:
-    lower_path = _path(url).lower()
-    return any(lower_path.endswith(ext) for ext in IMAGE_EXTENSIONS)
+def _is_image_path(lower_path: str) -> bool:
+    return lower_path.endswith(IMAGE_EXTENSIONS)
 
 
 def _split_space_attr(value: str | None) -> list[str]:
@@ -117,29 +168,54 @@ def _split_space_attr(value: str | None) -> list[str]:
     return [item.strip().lower() for item in value.split() if item.strip()]
 
 
-def extract_post_links(category_html: str, base_url: str = DEFAULT_BASE_URL) -> list[str]:
-    """Extract film post URLs from a category page."""
+def _is_next_link(attrs: dict[str, str]) -> bool:
+    return "next" in _split_space_attr(attrs.get("class")) or "next" in _split_space_attr(
+        attrs.get("rel")
+    )
+
+
+def extract_post_links_and_next(
+    category_html: str,
+    current_url: str,
+    base_url: str = DEFAULT_BASE_URL,
+) -> tuple[list[str], str | None]:
+    """Extract film post URLs and the next category page URL from a single parse."""
 
-    parser = _LinkParser()
-    parser.feed(category_html)
+    parser = _parse_page(category_html)
     base_host = _host(base_url)
 
     links: list[str] = []
+    next_page: str | None = None
     for attrs in parser.anchors:
         href = attrs.get("href")
         if not href:
             continue
-        normalized = _normalize_url(href, base_url)
-        if _host(normalized) != base_host:
+        normalized, host, path = _normalize_parts(href, base_url)
+        if next_page is None and _is_next_link(attrs):
+            next_page = normalized
+        if host != base_host:
             continue
-        path = _path(normalized)
         if not POST_URL_RE.match(path):
             continue
         if not path.endswith("/"):
             normalized = f"{normalized}/"
         links.append(normalized)
 
-    return _dedupe_preserve_order(links)
+    if next_page is None:
+        for attrs in parser.links:
+            href = attrs.get("href")
+            rel = _split_space_attr(attrs.get("rel"))
+            if href and "next" in rel:
+                next_page = _normalize_url(href, base_url)
+                break
+
+    return _dedupe_preserve_order(links), next_page
+
+
+def extract_post_links(category_html: str, base_url: str = DEFAULT_BASE_URL) -> list[str]:
+    """Extract film post URLs from a category page."""
+
+    return extract_post_links_and_next(category_html, "", base_url)[0]
 
 
 def extract_next_page_url(
@@ -149,33 +225,16 @@ def extract_next_page_url(
 ) -> str | None:
     """Extract the next category page URL if available."""
 
-    parser = _LinkParser()
-    parser.feed(category_html)
-
-    for attrs in parser.anchors:
-        href = attrs.get("href")
-        if not href:
-            continue
-        classes = _split_space_attr(attrs.get("class"))
-        rel = _split_space_attr(attrs.get("rel"))
-        if "next" not in classes and "next" not in rel:
-            continue
-        return _normalize_url(href, base_url)
-
-    for attrs in parser.links:
-        href = attrs.get("href")
-        rel = _split_space_attr(attrs.get("rel"))
-        if href and "next" in rel:
-            return _normalize_url(href, base_url)
-
-    return None
+    return extract_post_links_and_next(category_html, current_url, base_url)[1]
 
 
 def extract_zip_links(post_html: str, base_url: str = DEFAULT_BASE_URL) -> list[str]:
     """Extract ZIP download links from a film post."""
 
-    parser = _LinkParser()
-    parser.feed(post_html)
+    return _zip_links(_parse_page(post_html), base_url)
+
+
+def _zip_links(parser: _PageParser, base_url: str) -> list[str]:
     base_host = _host(base_url)
 
     zips: list[str] = []
@@ -183,10 +242,10 @@ def extract_zip_links(post_html: str, base_url: str = DEFAULT_BASE_URL) -> list[
         href = attrs.get("href")
         if not href:
             continue
-        normalized = _normalize_url(href, base_url)
-        if _host(normalized) != base_host:
+        normalized, host, path = _normalize_parts(href, base_url)
+        if host != base_host:
             continue
-        if _path(normalized).lower().endswith(".zip"):
+        if path.lower().endswith(".zip"):
             zips.append(normalized)
 
     return _dedupe_preserve_order(zips)
@@ -195,28 +254,22 @@ def extract_zip_links(post_html: str, base_url: str = DEFAULT_BASE_URL) -> list[
 def extract_images(post_html: str, base_url: str = DEFAULT_BASE_URL) -> list[str]:
     """Extract image URLs from a film post gallery."""
 
-    text = html.unescape(post_html)
-    parser = _MediaParser()
-    parser.feed(post_html)
+    return _images(_parse_page(post_html), base_url)
 
-    candidates: list[str] = []
-    candidates.extend(ABS_MEDIA_URL_RE.findall(text))
-    for rel in REL_MEDIA_URL_RE.findall(text):
-        candidates.append(urljoin(base_url, rel))
-    candidates.extend(parser.urls)
 
-    cleaned = [_normalize_url(candidate, base_url) for candidate in candidates]
+def _images(parser: _PageParser, base_url: str) -> list[str]:
     base_host = _host(base_url)
     images = []
-    for url in cleaned:
-        path = _path(url).lower()
-        if _host(url) != base_host:
+    for candidate in parser.media_urls:
+        url, host, path = _normalize_parts(candidate, base_url)
+        if host != base_host:
             continue
-        if "/wp-content/uploads/photo-gallery/" not in path:
+        lower_path = path.lower()
+        if "/wp-content/uploads/photo-gallery/" not in lower_path:
             continue
-        if "/wp-content/uploads/photo-gallery/thumb/" in path:
+        if "/wp-content/uploads/photo-gallery/thumb/" in lower_path:
             continue
-        if _is_image_url(url):
+        if _is_image_path(lower_path):
             images.append(url)
 
     return _dedupe_preserve_order(images)
@@ -225,26 +278,30 @@ def extract_images(post_html: str, base_url: str = DEFAULT_BASE_URL) -> list[str
 def extract_post_title(post_html: str, fallback: str) -> str:
     """Extract the post title, falling back to a derived name."""
 
-    match = re.search(r"<h1[^>]*>(.*?)</h1>", post_html, flags=re.IGNORECASE | re.DOTALL)
+    match = _H1_RE.search(post_html)
     if not match:
         return fallback
 
-    text = re.sub(r"<[^>]+>", " ", match.group(1))
-    clean = " ".join(html.unescape(text).split())
+    text = _TAG_RE.sub(" ", match.group(1))
+    if "&" in text:
+        text = html.unescape(text)
+    clean = " ".join(text.split())
     return clean or fallback
 
 
+@functools.lru_cache(maxsize=4096)
 def slugify(text: str) -> str:
     """Convert a title to a filesystem-safe slug."""
 
-    slug = re.sub(r"[^a-zA-Z0-9]+", "-", text.lower()).strip("-")
+    slug = _SLUG_RE.sub("-", text.lower()).strip("-")
     return slug or "untitled"
 
 
+@functools.lru_cache(maxsize=4096)
 def normalize_director_slug(director: str) -> str:
     """Normalize a director name into a category slug."""
 
-    normalized = re.sub(r"[^a-zA-Z0-9]+", "-", director.strip().lower()).strip("-")
+    normalized = _SLUG_RE.sub("-", director.strip().lower()).strip("-")
     return normalized or DEFAULT_DIRECTOR_SLUG
 
 
@@ -299,12 +356,68 @@ def _sleep_random(min_seconds: float, max_seconds: float) -> None:
         time.sleep(delay)
 
 
+class _RateLimiter:
+    """Thread-safe token bucket shared by all download workers of a scrape.
+
+    Requests may burst up to ``burst`` at once and are otherwise admitted at ``rate``
+    per second; callers only block when they get ahead of that rate.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = rate
+        self.capacity = float(max(1, burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_delays(cls, min_seconds: float, max_seconds: float, burst: int = 1) -> "_RateLimiter":
+        """Admit one request per average item delay; no limit when the delays are zero."""
+        if min_seconds > max_seconds:
+            min_seconds, max_seconds = max_seconds, min_seconds
+        mean_delay = (max(0.0, min_seconds) + max_seconds) / 2
+        return cls(rate=1 / mean_delay if max_seconds > 0 and mean_delay > 0 else 0, burst=burst)
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 def _request_text(session: requests.Session, url: str, timeout: int) -> str:
     response = session.get(url, timeout=timeout)
     response.raise_for_status()
     return response.text
 
 
+def _preallocate(fd: int, content_length: str | None) -> None:
+    """Reserve disk space for a download of known size where the platform supports it."""
+    if not content_length or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        size = int(content_length)
+    except ValueError:
+        return
+    if size <= 0:
+        return
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError:
+        # Not every filesystem supports fallocate; streaming works without it.
+        return
+
+
 def _download_file(
     session: requests.Session,
     url: str,
@@ -320,13 +433,108 @@ def _download_file(
     if referer:
         headers["Referer"] = referer
 
-    response = session.get(url, headers=headers, timeout=timeout)
-    response.raise_for_status()
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_bytes(response.content)
+    # Stream to disk so large ZIP archives are never held in memory as a whole. Write to a
+    # uniquely named temporary file first so an interrupted download is not mistaken for an
+    # existing file and concurrent jobs never share a partial file.
+    with session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        # "xb" never reuses another job's file, and unlike tempfile it keeps the umask-based
+        # mode, so the final file gets the same permissions as a plain open() would give it
+        part_path = out_path.with_name(f"{out_path.name}.{uuid.uuid4().hex}.part")
+        out_file = part_path.open("xb")
+        try:
+            with out_file:
+                _preallocate(out_file.fileno(), response.headers.get("Content-Length"))
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    out_file.write(chunk)
+                # Drop any preallocated tail if the body was shorter than advertised.
+                out_file.truncate()
+            part_path.replace(out_path)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
     return True
 
 
+def _download_limited(
+    limiter: _RateLimiter,
+    session: requests.Session,
+    url: str,
+    out_path: Path,
+    timeout: int,
+    referer: str | None,
+    skip_existing: bool,
+) -> bool:
+    if skip_existing and out_path.exists():
+        return False
+    limiter.acquire()
+    return _download_file(
+        session=session,
+        url=url,
+        out_path=out_path,
+        timeout=timeout,
+        referer=referer,
+        skip_existing=skip_existing,
+    )
+
+
+def _download_batch(
+    session: requests.Session,
+    jobs: list[tuple[str, Path]],
+    timeout: int,
+    referer: str | None,
+    skip_existing: bool,
+    max_workers: int,
+    limiter: _RateLimiter,
+) -> tuple[int, list[tuple[str, OSError]]]:
+    """Download ``(url, out_path)`` jobs concurrently.
+
+    Returns the number of newly saved files and the failed URLs with their errors,
+    both in job order.
+    """
+
+    saved_count = 0
+    failures: list[tuple[str, OSError]] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _download_limited,
+                limiter,
+                session,
+                url,
+                out_path,
+                timeout,
+                referer,
+                skip_existing,
+            )
+            for url, out_path in jobs
+        ]
+        for (url, _), future in zip(jobs, futures):
+            try:
+                if future.result():
+                    saved_count += 1
+            except OSError as exc:  # includes requests.RequestException and local disk errors
+                failures.append((url, exc))
+    return saved_count, failures
+
+
+def _dedupe_job_paths(jobs: list[tuple[str, Path]]) -> list[tuple[str, Path]]:
+    # Different URLs can share a basename (e.g. .../2020/01/Gallery.zip and
+    # .../2021/05/Gallery.zip); suffix later ones so no two jobs write the same file.
+    seen: set[Path] = set()
+    deduped: list[tuple[str, Path]] = []
+    for url, out_path in jobs:
+        candidate = out_path
+        counter = 2
+        while candidate in seen:
+            candidate = out_path.with_name(f"{out_path.stem}-{counter}{out_path.suffix}")
+            counter += 1
+        seen.add(candidate)
+        deduped.append((url, candidate))
+    return deduped
+
+
 def _extension_from_url(url: str, fallback: str) -> str:
     path = _path(url)
     suffix = Path(path).suffix.lower()
@@ -353,10 +561,10 @@ def _iter_category_posts(
 
         visited_pages.add(page_url)
         html_text = _request_text(session, page_url, timeout)
-        posts.extend(extract_post_links(html_text, base_url))
+        page_posts, next_page = extract_post_links_and_next(html_text, page_url, base_url)
+        posts.extend(page_posts)
         page_count += 1
 
-        next_page = extract_next_page_url(html_text, page_url, base_url)
         if not next_page or next_page in visited_pages:
             break
 
@@ -366,6 +574,24 @@ def _iter_category_posts(
     return _dedupe_preserve_order(posts)
 
 
+def build_session(max_workers: int = DEFAULT_MAX_WORKERS) -> requests.Session:
+    """Build a keep-alive HTTP session with a connection pool sized for ``max_workers``."""
+
+    session = requests.Session()
+    session.headers.update(
+        {
+            "User-Agent": "Mozilla/5.0 (compatible; filmgrab-scraper/1.0)",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        }
+    )
+    # size the connection pool to the worker count so concurrent downloads do not queue on it
+    pool_size = max(1, max_workers)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 def scrape_category(
     category_url: str = DEFAULT_CATEGORY_URL,
     output_dir: Path = DEFAULT_OUTPUT_DIR,
@@ -380,22 +606,27 @@ def scrape_category(
     page_delay_max: float = 1.8,
     skip_existing: bool = True,
     dry_run: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    session: requests.Session | None = None,
 ) -> dict[str, Any]:
-    """Scrape all films in a FilmGrab category page."""
+    """Scrape all films in a FilmGrab category page.
+
+    Files of one film are downloaded concurrently by up to ``max_workers`` threads.
+    Pass a ``session`` from :func:`build_session` to reuse its open connections
+    across several scrapes.
+    """
 
     if download_mode not in {"auto", "zip", "images", "both"}:
         msg = f"Unsupported download mode: {download_mode}"
         raise ValueError(msg)
 
     output_dir.mkdir(parents=True, exist_ok=True)
+    max_workers = max(1, max_workers)
 
-    session = requests.Session()
-    session.headers.update(
-        {
-            "User-Agent": "Mozilla/5.0 (compatible; filmgrab-scraper/1.0)",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        }
-    )
+    if session is None:
+        session = build_session(max_workers)
+    # item delays set the average download rate; workers only wait when they outpace it
+    limiter = _RateLimiter.from_delays(item_delay_min, item_delay_max, burst=max_workers)
 
     post_urls = _iter_category_posts(
         session=session,
@@ -420,12 +651,13 @@ def scrape_category(
             post_html = _request_text(session, post_url, timeout)
         except requests.RequestException as exc:
             film_errors.append(str(exc))
+            fallback_slug = slugify(fallback_name)
             film_results.append(
                 FilmScrapeResult(
                     title=fallback_name,
-                    slug=slugify(fallback_name),
+                    slug=fallback_slug,
                     post_url=post_url,
-                    folder=str(output_dir / slugify(fallback_name)),
+                    folder=str(output_dir / fallback_slug),
                     image_count=0,
                     zip_count=0,
                     downloaded_images=0,
@@ -438,8 +670,10 @@ def scrape_category(
         title = extract_post_title(post_html, fallback_name)
         slug = slugify(title)
         film_dir = output_dir / slug
-        zip_links = extract_zip_links(post_html, base_url)
-        image_links = extract_images(post_html, base_url)
+        # tokenize the post once and share the result between ZIP and image extraction
+        post_page = _parse_page(post_html)
+        zip_links = _zip_links(post_page, base_url)
+        image_links = _images(post_page, base_url)
 
         use_zip = download_mode in {"zip", "both"} or (download_mode == "auto" and bool(zip_links))
         use_images = download_mode in {"images", "both"} or (
@@ -449,49 +683,45 @@ def scrape_category(
         downloaded_zips = 0
         downloaded_images = 0
 
+        download_options: dict[str, Any] = {
+            "session": session,
+            "timeout": timeout,
+            "referer": post_url,
+            "skip_existing": skip_existing,
+            "max_workers": max_workers,
+            "limiter": limiter,
+        }
+
         if use_zip:
-            for zip_index, zip_url in enumerate(zip_links, start=1):
-                zip_name = Path(_path(zip_url)).name or f"gallery-{zip_index:02d}.zip"
-                out_path = film_dir / zip_name
-                try:
-                    if not dry_run:
-                        saved = _download_file(
-                            session=session,
-                            url=zip_url,
-                            out_path=out_path,
-                            timeout=timeout,
-                            referer=post_url,
-                            skip_existing=skip_existing,
-                        )
-                        if saved:
-                            downloaded_zips += 1
-                    else:
-                        downloaded_zips += 1
-                except requests.RequestException as exc:
-                    film_errors.append(f"ZIP download failed: {zip_url} ({exc})")
-                _sleep_random(item_delay_min, item_delay_max)
+            zip_jobs = _dedupe_job_paths(
+                [
+                    (
+                        zip_url,
+                        film_dir / (Path(_path(zip_url)).name or f"gallery-{zip_index:02d}.zip"),
+                    )
+                    for zip_index, zip_url in enumerate(zip_links, start=1)
+                ]
+            )
+            if dry_run:
+                downloaded_zips = len(zip_jobs)
+            else:
+                downloaded_zips, failures = _download_batch(jobs=zip_jobs, **download_options)
+                film_errors.extend(
+                    f"ZIP download failed: {zip_url} ({exc})" for zip_url, exc in failures
+                )
 
         if use_images:
-            for image_index, image_url in enumerate(image_links, start=1):
-                ext = _extension_from_url(image_url, ".jpg")
-                out_path = film_dir / f"{image_index:03d}{ext}"
-                try:
-                    if not dry_run:
-                        saved = _download_file(
-                            session=session,
-                            url=image_url,
-                            out_path=out_path,
-                            timeout=timeout,
-                            referer=post_url,
-                            skip_existing=skip_existing,
-                        )
-                        if saved:
-                            downloaded_images += 1
-                    else:
-                        downloaded_images += 1
-                except requests.RequestException as exc:
-                    film_errors.append(f"Image download failed: {image_url} ({exc})")
-                _sleep_random(item_delay_min, item_delay_max)
+            image_jobs = [
+                (image_url, film_dir / f"{image_index:03d}{_extension_from_url(image_url, '.jpg')}")
+                for image_index, image_url in enumerate(image_links, start=1)
+            ]
+            if dry_run:
+                downloaded_images = len(image_jobs)
+            else:
+                downloaded_images, failures = _download_batch(jobs=image_jobs, **download_options)
+                film_errors.extend(
+                    f"Image download failed: {image_url} ({exc})" for image_url, exc in failures
+                )
 
         film_results.append(
             FilmScrapeResult(
@@ -573,6 +803,12 @@ def build_parser() -> argparse.ArgumentParser:
         help="Skip already-downloaded files when true.",
     )
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help="Number of concurrent file downloads per film.",
+    )
     return parser
 
 
@@ -600,6 +836,7 @@ def main() -> None:
         page_delay_max=args.page_delay_max,
         skip_existing=args.skip_existing,
         dry_run=args.dry_run,
+        max_workers=args.max_workers,
     )
 
     zip_film_count = sum(1 for film in report["films"] if film["zip_count"] > 0)
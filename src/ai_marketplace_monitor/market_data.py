@@ -1,9 +1,14 @@
+import atexit
+import functools
+import hashlib
 import re
 import sqlite3
-from dataclasses import dataclass
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Tuple
 
 from .listing import Listing
 from .utils import amm_home
@@ -25,14 +30,14 @@ _MODEL_PATTERN_RAW: dict[str, tuple[str, ...]] = {
         r"\bgr\s*iii\s*hdf\b",
     ),
     "ricoh_gr3x": (
-        r"\bgr3x(?!\s*hdf|hdf)\b",
-        r"\bgriiix(?!\s*hdf|hdf)\b",
+        r"\bgr3x(?!\s*hdf)\b",
+        r"\bgriiix(?!\s*hdf)\b",
         r"\bgr\s*iii\s*x(?!\s*hdf)\b",
     ),
     "ricoh_gr4": (r"\bgr4\b", r"\bgriv\b", r"\bgr\s*iv\b"),
     "ricoh_gr3": (
-        r"\bgr3(?!x|\s*hdf|hdf)\b",
-        r"\bgriii(?!x|\s*hdf|hdf)\b",
+        r"\bgr3(?!x|\s*hdf)\b",
+        r"\bgriii(?!x|\s*hdf)\b",
         r"\bgr\s*iii(?!\s*x|\s*hdf)\b",
     ),
     "ricoh_gr2": (r"\bgr2\b", r"\bgrii\b", r"\bgr\s*ii\b"),
@@ -55,8 +60,8 @@ _MODEL_PATTERN_RAW: dict[str, tuple[str, ...]] = {
         r"\bilce[-\s]?1m2\b",
     ),
     "sony_a1": (
-        r"\bsony\s*a1(?!\s*(ii|2|m2)|ii|2|m2)\b",
-        r"\balpha\s*1(?!\s*(ii|2)|ii|2)\b",
+        r"\bsony\s*a1(?!\s*(?:ii|2|m2))\b",
+        r"\balpha\s*1(?!\s*(?:ii|2))\b",
         r"\bilce[-\s]?1\b",
     ),
     "sony_a9iii": (
@@ -74,24 +79,24 @@ _MODEL_PATTERN_RAW: dict[str, tuple[str, ...]] = {
         r"\bilce[-\s]?9m2\b",
     ),
     "sony_a9": (
-        r"\ba9(?!\s*(ii|iii|2|3)|ii|iii|2|3)\b",
-        r"\balpha\s*9(?!\s*(ii|iii|2|3)|ii|iii|2|3)\b",
-        r"\bsony\s*a9(?!\s*(ii|iii|2|3)|ii|iii|2|3)\b",
+        r"\ba9(?!\s*(?:ii|iii|2|3))\b",
+        r"\balpha\s*9(?!\s*(?:ii|iii|2|3))\b",
+        r"\bsony\s*a9(?!\s*(?:ii|iii|2|3))\b",
         r"\bilce[-\s]?9\b",
     ),
     "sony_a7c": (
-        r"\ba7c(?!\s*(ii|2|r)|ii|2|r)\b",
-        r"\balpha\s*7c(?!\s*(ii|2|r))\b",
-        r"\bsony\s*a7c(?!\s*(ii|2|r))\b",
+        r"\ba7c(?!\s*(?:ii|2|r))\b",
+        r"\balpha\s*7c(?!\s*(?:ii|2|r))\b",
+        r"\bsony\s*a7c(?!\s*(?:ii|2|r))\b",
         r"\bilce[-\s]?7c\b",
     ),
     "sony_a7ii": (r"\ba7\s*ii\b", r"\ba7ii\b"),
     "sony_a7iii": (r"\ba7\s*iii\b", r"\ba7iii\b"),
     "sony_a7iv": (r"\ba7\s*iv\b", r"\ba7iv\b"),
     "sony_a7r": (
-        r"\ba7r(?!\s*(ii|iii|iv|v|2|3|4)|ii|iii|iv|v|2|3|4)\b",
-        r"\balpha\s*7r(?!\s*(ii|iii|iv|v|2|3|4)|ii|iii|iv|v|2|3|4)\b",
-        r"\bsony\s*a7r(?!\s*(ii|iii|iv|v|2|3|4)|ii|iii|iv|v|2|3|4)\b",
+        r"\ba7r(?!\s*(?:ii|iii|iv|v|2|3|4))\b",
+        r"\balpha\s*7r(?!\s*(?:ii|iii|iv|v|2|3|4))\b",
+        r"\bsony\s*a7r(?!\s*(?:ii|iii|iv|v|2|3|4))\b",
         r"\ba7r\s*[56]\b",
         r"\ba7r[56]\b",
     ),
@@ -103,9 +108,9 @@ _MODEL_PATTERN_RAW: dict[str, tuple[str, ...]] = {
     "sony_a7siii": (r"\ba7s\s*iii\b", r"\ba7siii\b", r"\ba7s3\b"),
     "sony_a7s": (r"\ba7s\b",),
     "sony_a7": (
-        r"\ba7(?!\s*(ii|iii|iv|v|2|3|4|5|c|cr|r|s)|ii|iii|iv|v|2|3|4|5|c|cr|r|s)\b",
-        r"\balpha\s*7(?!\s*(ii|iii|iv|v|2|3|4|5|c|cr|r|s)|ii|iii|iv|v|2|3|4|5|c|cr|r|s)\b",
-        r"\bsony\s*a7(?!\s*(ii|iii|iv|v|2|3|4|5|c|cr|r|s)|ii|iii|iv|v|2|3|4|5|c|cr|r|s)\b",
+        r"\ba7(?!\s*(?:ii|iii|iv|v|2|3|4|5|c|cr|r|s))\b",
+        r"\balpha\s*7(?!\s*(?:ii|iii|iv|v|2|3|4|5|c|cr|r|s))\b",
+        r"\bsony\s*a7(?!\s*(?:ii|iii|iv|v|2|3|4|5|c|cr|r|s))\b",
     ),
     "sony_rx100vii": (
         r"\brx100\s*vii\b",
@@ -154,7 +159,7 @@ _MODEL_PATTERN_RAW: dict[str, tuple[str, ...]] = {
         r"\brx1002\b",
     ),
     "sony_rx100": (
-        r"\brx100(?!\s*(ii|iii|iv|v|vi|vii|2|3|4|5|6|7|m2|m3|m4|m5|m5a|m6|m7)|ii|iii|iv|v|vi|vii|2|3|4|5|6|7|m2|m3|m4|m5|m5a|m6|m7)\b",
+        r"\brx100(?!\s*(?:ii|iii|iv|v|vi|vii|2|3|4|5|6|7|m2|m3|m4|m5|m5a|m6|m7))\b",
     ),
     "sony_rx10iv": (
         r"\brx10\s*iv\b",
@@ -175,7 +180,7 @@ _MODEL_PATTERN_RAW: dict[str, tuple[str, ...]] = {
         r"\brx102\b",
     ),
     "sony_rx10": (
-        r"\brx10(?!\s*(ii|iii|iv|2|3|4|m2|m3|m4)|ii|iii|iv|2|3|4|m2|m3|m4)\b",
+        r"\brx10(?!\s*(?:ii|iii|iv|2|3|4|m2|m3|m4))\b",
     ),
     "sony_rx1r2": (
         r"\brx1r\s*ii\b",
@@ -183,7 +188,7 @@ _MODEL_PATTERN_RAW: dict[str, tuple[str, ...]] = {
         r"\brx1r2\b",
         r"\brx1r\s*mark\s*ii\b",
     ),
-    "sony_rx1r": (r"\brx1r(?!\s*(ii|2|mark\s*ii)|ii|2)\b",),
+    "sony_rx1r": (r"\brx1r(?!\s*(?:ii|2|mark\s*ii))\b",),
     "sony_rx1": (r"\brx1(?!r)\b",),
     "sony_fx30": (r"\bfx30\b",),
     "sony_fx3": (r"\bfx3\b",),
@@ -212,11 +217,70 @@ _MODEL_PATTERN_RAW: dict[str, tuple[str, ...]] = {
     "olympus_om2": (r"\bom[-\s]?2\b", r"\bolympus\s*om[-\s]?2\b"),
 }
 
+
+# Classifier patterns are written in lower case and only ever run against lower-cased text
+# (see _classify_listing), so they are compiled without re.IGNORECASE.
+def _compile_union(*patterns: str) -> re.Pattern[str]:
+    # one alternation per pattern group: a single search instead of one per alternative
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
 _MODEL_PATTERNS = {
-    model: tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
-    for model, patterns in _MODEL_PATTERN_RAW.items()
+    model: _compile_union(*patterns) for model, patterns in _MODEL_PATTERN_RAW.items()
 }
 
+
+def _literal_prefix(raw_pattern: str) -> str:
+    matched = re.match(r"\\b([a-z0-9]+)", raw_pattern)
+    if matched is None:
+        raise ValueError(f"Model pattern must start with \\b and a literal: {raw_pattern}")
+    return matched.group(1)
+
+
+def _build_model_anchors() -> dict[str, tuple[tuple[str, re.Pattern[str]], ...]]:
+    grouped: dict[str, dict[str, list[str]]] = {}
+    for model, patterns in _MODEL_PATTERN_RAW.items():
+        for raw_pattern in patterns:
+            by_model = grouped.setdefault(_literal_prefix(raw_pattern), {})
+            by_model.setdefault(model, []).append(raw_pattern)
+    return {
+        prefix: tuple(
+            (model, _compile_union(*patterns)) for model, patterns in by_model.items()
+        )
+        for prefix, by_model in grouped.items()
+    }
+
+
+# Every model pattern starts with \b and a literal prefix (gr3x, a7c, sony, rx100, ...).
+# A single scan finds the words that can start a match; only the patterns whose prefix
+# begins such a word are then tried, anchored at that position.
+_MODEL_ANCHORS = _build_model_anchors()
+_MODEL_TRIGGERS = sorted(
+    {
+        prefix
+        for prefix in _MODEL_ANCHORS
+        if not any(prefix != other and prefix.startswith(other) for other in _MODEL_ANCHORS)
+    }
+)
+_MODEL_TRIGGER_RE = re.compile(r"\b(?:" + "|".join(_MODEL_TRIGGERS) + r")[a-z0-9]*")
+# Every model pattern and fallback token needs a digit, except the Ricoh "gr ii/iii/iv"
+# spellings, so text with neither cannot match anything.
+_MODEL_TEXT_GATE = re.compile(r"[0-9]|gr")
+
+
+# listing text keeps repeating the same words (sony, a7iv, rx100, ...), so resolve the
+# (model, bound match) pairs whose prefix starts a word once per distinct word
+@functools.lru_cache(maxsize=4096)
+def _anchored_candidates(
+    word: str,
+) -> tuple[tuple[str, Callable[[str, int], Optional[re.Match[str]]]], ...]:
+    return tuple(
+        (model, pattern.match)
+        for end in range(1, len(word) + 1)
+        for model, pattern in _MODEL_ANCHORS.get(word[:end], ())
+    )
+
+
 _TARGET_MODEL_ALIASES = {
     "gr2": "ricoh_gr2",
     "grii": "ricoh_gr2",
@@ -339,56 +403,82 @@ _TARGET_MODEL_ALIASES = {
     "olympus": "olympus_unknown",
 }
 
-_ACCESSORY_PATTERNS = (
-    re.compile(r"\bquick[\s-]?release\b", re.IGNORECASE),
-    re.compile(r"\bplate\b", re.IGNORECASE),
-    re.compile(r"\bgrip\b", re.IGNORECASE),
-    re.compile(r"\bhandgrip\b", re.IGNORECASE),
-    re.compile(r"\bl[-\s]?shape\b", re.IGNORECASE),
-    re.compile(r"\bl[-\s]?bracket\b", re.IGNORECASE),
-    re.compile(r"\bcage\b", re.IGNORECASE),
-    re.compile(r"\brig\b", re.IGNORECASE),
-    re.compile(r"\bmount\b", re.IGNORECASE),
-    re.compile(r"\badapter\b", re.IGNORECASE),
-    re.compile(r"\bbattery\b", re.IGNORECASE),
-    re.compile(r"\bcharger\b", re.IGNORECASE),
-    re.compile(r"\bcase\b", re.IGNORECASE),
-    re.compile(r"\bstrap\b", re.IGNORECASE),
-    re.compile(r"\btripod\b", re.IGNORECASE),
-    re.compile(r"\bgimbal\b", re.IGNORECASE),
-    re.compile(r"\bhot[\s-]?shoe\b", re.IGNORECASE),
+_ACCESSORY_PATTERN_RAW = (
+    r"\bquick[\s-]?release\b",
+    r"\bplate\b",
+    r"\bgrip\b",
+    r"\bhandgrip\b",
+    r"\bl[-\s]?shape\b",
+    r"\bl[-\s]?bracket\b",
+    r"\bcage\b",
+    r"\brig\b",
+    r"\bmount\b",
+    r"\badapter\b",
+    r"\bbattery\b",
+    r"\bcharger\b",
+    r"\bcase\b",
+    r"\bstrap\b",
+    r"\btripod\b",
+    r"\bgimbal\b",
+    r"\bhot[\s-]?shoe\b",
 )
 
-_LENS_PATTERNS = (
-    re.compile(r"\blens\b", re.IGNORECASE),
-    re.compile(r"\b\d{2,3}\s?mm\b", re.IGNORECASE),
-    re.compile(r"\bf\/\d", re.IGNORECASE),
+_LENS_PATTERN_RAW = (
+    r"\blens\b",
+    r"\b\d{2,3}\s?mm\b",
+    r"\bf\/\d",
 )
 
-_CAMERA_PATTERNS = (
-    re.compile(r"\bcamera\b", re.IGNORECASE),
-    re.compile(r"\bmirrorless\b", re.IGNORECASE),
-    re.compile(r"\bcamera body\b", re.IGNORECASE),
-    re.compile(r"\bbody only\b", re.IGNORECASE),
+_CAMERA_PATTERN_RAW = (
+    r"\bcamera\b",
+    r"\bmirrorless\b",
+    r"\bcamera body\b",
+    r"\bbody only\b",
 )
 
-_COMPATIBILITY_PATTERNS = (
-    re.compile(r"\bfor\s+(sony|alpha|a7|zv|rx|ilce)", re.IGNORECASE),
-    re.compile(r"\bcompatible with\b", re.IGNORECASE),
-    re.compile(r"\bworks with\b", re.IGNORECASE),
-    re.compile(r"\bfits?\b", re.IGNORECASE),
+_COMPATIBILITY_PATTERN_RAW = (
+    r"\bfor\s+(sony|alpha|a7|zv|rx|ilce)",
+    r"\bcompatible with\b",
+    r"\bworks with\b",
+    r"\bfits?\b",
 )
 
-_SONY_MODEL_TOKEN = re.compile(
-    r"\b(?:sony\s*)?(a[0-9][a-z0-9]{0,7})\b",
-    re.IGNORECASE,
-)
+_ACCESSORY_FLAG = 1
+_LENS_FLAG = 2
+_CAMERA_FLAG = 4
+_COMPATIBILITY_FLAG = 8
+_LISTING_CATEGORY_FLAGS = {
+    "accessory": _ACCESSORY_FLAG,
+    "lens": _LENS_FLAG,
+    "camera": _CAMERA_FLAG,
+    "compatibility": _COMPATIBILITY_FLAG,
+}
+
 
-_SONY_RX_MODEL_TOKEN = re.compile(
-    r"\b(?:sony\s*)?(rx(?:1r?|10|100)[a-z0-9]{0,8})\b",
-    re.IGNORECASE,
+def _compile_listing_categories(categories: dict[str, tuple[str, ...]]) -> re.Pattern[str]:
+    # every category pattern starts with \b; factor it out so one scan only tries the
+    # alternatives at word starts, and the named group of a hit tells which category fired
+    groups = []
+    for name, patterns in categories.items():
+        if not all(pattern.startswith(r"\b") for pattern in patterns):
+            raise ValueError(f"Listing category patterns must start with \\b: {name}")
+        groups.append(f"(?P<{name}>" + "|".join(pattern[2:] for pattern in patterns) + ")")
+    return re.compile(r"\b(?=\w)(?:" + "|".join(groups) + ")")
+
+
+_LISTING_CATEGORY_RE = _compile_listing_categories(
+    {
+        "accessory": _ACCESSORY_PATTERN_RAW,
+        "lens": _LENS_PATTERN_RAW,
+        "camera": _CAMERA_PATTERN_RAW,
+        "compatibility": _COMPATIBILITY_PATTERN_RAW,
+    }
 )
 
+_SONY_MODEL_TOKEN = re.compile(r"\b(?:sony\s*)?(a[0-9][a-z0-9]{0,7})\b")
+
+_SONY_RX_MODEL_TOKEN = re.compile(r"\b(?:sony\s*)?(rx(?:1r?|10|100)[a-z0-9]{0,8})\b")
+
 _GENERIC_SONY_ALIAS = {
     "a1": "sony_a1",
     "a1ii": "sony_a1ii",
@@ -485,48 +575,130 @@ _GENERIC_RX_ALIAS = {
     "rx10m4": "sony_rx10iv",
 }
 
-_SONY_FOUR_DIGIT_ALPHA = re.compile(r"a(\d{4})", re.IGNORECASE)
-
-_GENERIC_MODEL_OVERRIDES: dict[str, set[str]] = {
-    "sony_a1": {"sony_a1ii"},
-    "sony_a9": {"sony_a9ii", "sony_a9iii"},
-    "sony_a7": {
-        "sony_a7ii",
-        "sony_a7iii",
-        "sony_a7iv",
-        "sony_a7c",
-        "sony_a7c2",
-        "sony_a7cr",
-        "sony_a7r",
-        "sony_a7rii",
-        "sony_a7riii",
-        "sony_a7riv",
-        "sony_a7rv",
-        "sony_a7s",
-        "sony_a7sii",
-        "sony_a7siii",
-    },
-    "sony_a7c": {"sony_a7c2", "sony_a7cr"},
-    "sony_a7r": {"sony_a7rii", "sony_a7riii", "sony_a7riv", "sony_a7rv"},
-    "sony_a7s": {"sony_a7sii", "sony_a7siii"},
-    "sony_rx1": {"sony_rx1r", "sony_rx1r2"},
-    "sony_rx100": {
-        "sony_rx100ii",
-        "sony_rx100iii",
-        "sony_rx100iv",
-        "sony_rx100v",
-        "sony_rx100va",
-        "sony_rx100vi",
-        "sony_rx100vii",
-    },
-    "sony_rx10": {"sony_rx10ii", "sony_rx10iii", "sony_rx10iv"},
-    "sony_zv1": {"sony_zv1ii", "sony_zv1f"},
-    "sony_zve10": {"sony_zve10ii"},
+_SONY_FOUR_DIGIT_ALPHA = re.compile(r"a(\d{4})")
+
+# model tokens only ever contain ASCII separators, so strip them without the regex engine
+_TOKEN_SEPARATORS = str.maketrans("", "", " \t\n\r\f\v-")
+_SONY_A7_MARK = re.compile(r"^a7m([2-6])$")
+_SONY_A7_VARIANT_MARK = re.compile(r"^a7([crs])m([2-6])$")
+_SONY_A9_MARK = re.compile(r"^a9m([23])$")
+
+_GENERIC_MODEL_OVERRIDES: dict[str, frozenset[str]] = {
+    "sony_a1": frozenset({"sony_a1ii"}),
+    "sony_a9": frozenset({"sony_a9ii", "sony_a9iii"}),
+    "sony_a7": frozenset(
+        {
+            "sony_a7ii",
+            "sony_a7iii",
+            "sony_a7iv",
+            "sony_a7c",
+            "sony_a7c2",
+            "sony_a7cr",
+            "sony_a7r",
+            "sony_a7rii",
+            "sony_a7riii",
+            "sony_a7riv",
+            "sony_a7rv",
+            "sony_a7s",
+            "sony_a7sii",
+            "sony_a7siii",
+        }
+    ),
+    "sony_a7c": frozenset({"sony_a7c2", "sony_a7cr"}),
+    "sony_a7r": frozenset({"sony_a7rii", "sony_a7riii", "sony_a7riv", "sony_a7rv"}),
+    "sony_a7s": frozenset({"sony_a7sii", "sony_a7siii"}),
+    "sony_rx1": frozenset({"sony_rx1r", "sony_rx1r2"}),
+    "sony_rx100": frozenset(
+        {
+            "sony_rx100ii",
+            "sony_rx100iii",
+            "sony_rx100iv",
+            "sony_rx100v",
+            "sony_rx100va",
+            "sony_rx100vi",
+            "sony_rx100vii",
+        }
+    ),
+    "sony_rx10": frozenset({"sony_rx10ii", "sony_rx10iii", "sony_rx10iv"}),
+    "sony_zv1": frozenset({"sony_zv1ii", "sony_zv1f"}),
+    "sony_zve10": frozenset({"sony_zve10ii"}),
 }
 
 
-@dataclass(frozen=True)
-class ListingClassification:
+_RECLASSIFY_BATCH_SIZE = 1000
+_SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+_SQLITE_ANALYSIS_LIMIT = 1000
+_SNAPSHOT_CACHE_SIZE = 4096
+_SCHEMA_VERSION = 1
+
+# one page of rows to reclassify, keyed after the last seen id; one fixed statement per
+# selection instead of splicing a WHERE fragment into a shared query
+_SELECT_UNCLASSIFIED_SQL = """
+    SELECT
+        id,
+        marketplace,
+        item_name,
+        listing_id,
+        title,
+        post_url,
+        price_text,
+        location,
+        seller,
+        item_condition,
+        description,
+        classification_reason,
+        classification_input_hash
+    FROM listing_observations
+    WHERE id > ? AND classification_reason IS NULL
+    ORDER BY id
+    LIMIT ?
+"""
+_SELECT_UNKNOWN_OR_UNCLASSIFIED_SQL = """
+    SELECT
+        id,
+        marketplace,
+        item_name,
+        listing_id,
+        title,
+        post_url,
+        price_text,
+        location,
+        seller,
+        item_condition,
+        description,
+        classification_reason,
+        classification_input_hash
+    FROM listing_observations
+    WHERE id > ?
+      AND (COALESCE(detected_model, 'unknown') = 'unknown' OR classification_reason IS NULL)
+    ORDER BY id
+    LIMIT ?
+"""
+
+# (seen out of stock, seen in a non-out state) for one listing; each EXISTS stops at the first
+# idx_listing_obs_listing entry without reading the table row
+_OBSERVATION_FLAGS_SQL = """
+    SELECT
+        EXISTS(
+            SELECT 1
+            FROM listing_observations
+            WHERE marketplace = ?1 AND listing_id = ?2 AND availability = 'out'
+        ),
+        EXISTS(
+            SELECT 1
+            FROM listing_observations
+            WHERE marketplace = ?1 AND listing_id = ?2 AND availability != 'out'
+        )
+"""
+
+_PRICE_RE = re.compile(r"(?P<currency>[^\d\s]{1,3}|[A-Z]{3})?\s*(?P<value>\d[\d,]*(?:\.\d+)?)")
+_SENTENCE_SPLIT_RE = re.compile(r"[.!?\n]")
+_ITEM_NAME_SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
+
+
+# a NamedTuple rather than a dataclass: one is built per classified row, and callers mostly
+# unpack it straight into UPDATE parameters
+class ListingClassification(NamedTuple):
     detected_model: str
     listing_type: str
     is_target_exact: int
@@ -534,6 +706,37 @@ class ListingClassification:
     reason: str
 
 
+# Bump when classification logic changes in a way the pattern tables below do not capture,
+# so rows stamped with an older classification input hash get reclassified.
+_CLASSIFIER_VERSION = 1
+_CLASSIFIER_FINGERPRINT = hashlib.blake2b(
+    repr(
+        (
+            _CLASSIFIER_VERSION,
+            _MODEL_PATTERN_RAW,
+            _TARGET_MODEL_ALIASES,
+            _GENERIC_SONY_ALIAS,
+            _GENERIC_RX_ALIAS,
+            sorted((model, sorted(models)) for model, models in _GENERIC_MODEL_OVERRIDES.items()),
+            _ACCESSORY_PATTERN_RAW,
+            _LENS_PATTERN_RAW,
+            _CAMERA_PATTERN_RAW,
+            _COMPATIBILITY_PATTERN_RAW,
+        )
+    ).encode(),
+    digest_size=16,
+).digest()
+
+
+def _classification_input_hash(title: str, description: str, item_name: str) -> str:
+    # identifies the classifier version plus the stored text a classification was derived from
+    return hashlib.blake2b(
+        f"{title}\x00{description}\x00{item_name}".encode(),
+        digest_size=16,
+        key=_CLASSIFIER_FINGERPRINT,
+    ).hexdigest()
+
+
 def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
 
@@ -545,15 +748,14 @@ def _parse_datetime(ts: str) -> datetime:
     return parsed
 
 
+# the same listings are re-observed on every search pass, so their price strings repeat
+@functools.lru_cache(maxsize=8192)
 def _parse_price(price_text: str) -> Tuple[float | None, str | None]:
     if not price_text or price_text == "**unspecified**":
         return None, None
 
     primary = price_text.split("|")[0].strip()
-    matched = re.search(
-        r"(?P<currency>[^\d\s]{1,3}|[A-Z]{3})?\s*(?P<value>\d[\d,]*(?:\.\d+)?)",
-        primary,
-    )
+    matched = _PRICE_RE.search(primary)
     if matched is None:
         return None, None
 
@@ -563,68 +765,91 @@ def _parse_price(price_text: str) -> Tuple[float | None, str | None]:
 
 
 def _first_sentence(text: str) -> str:
-    for sentence in re.split(r"[.!?\n]", text or ""):
+    for sentence in _SENTENCE_SPLIT_RE.split(text or ""):
         normalized = " ".join(sentence.split()).strip()
         if normalized:
             return normalized
     return ""
 
 
+# item names come from a small, fixed set of configured searches
+@functools.lru_cache(maxsize=256)
 def _normalize_item_name(item_name: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "_", item_name.lower()).strip("_")
-
-
-def _contains_any(text: str, patterns: tuple[re.Pattern[str], ...]) -> bool:
-    return any(pattern.search(text) is not None for pattern in patterns)
+    return _ITEM_NAME_SEPARATOR_RE.sub("_", item_name.lower()).strip("_")
 
 
 def _normalize_sony_token(token: str) -> str:
-    normalized = re.sub(r"[\s\-]+", "", token.lower())
+    normalized = token.lower().translate(_TOKEN_SEPARATORS)
+    if "m" not in normalized:
+        return normalized
     # normalize mark-style shorthand: a7m3/a7rm4/a7sm3/a7cm2 -> a73/a7r4/a7s3/a7c2
-    normalized = re.sub(r"^a7m([2-6])$", r"a7\1", normalized)
-    normalized = re.sub(r"^a7([crs])m([2-6])$", r"a7\1\2", normalized)
-    normalized = re.sub(r"^a9m([23])$", r"a9\1", normalized)
+    normalized = _SONY_A7_MARK.sub(r"a7\1", normalized)
+    normalized = _SONY_A7_VARIANT_MARK.sub(r"a7\1\2", normalized)
+    normalized = _SONY_A9_MARK.sub(r"a9\1", normalized)
     if normalized == "a1m2":
         return "a1ii"
     return normalized
 
 
 def _normalize_rx_token(token: str) -> str:
-    normalized = re.sub(r"[\s\-]+", "", token.lower())
+    normalized = token.lower().translate(_TOKEN_SEPARATORS)
     normalized = normalized.replace("mark", "")
     return normalized
 
 
 def _extract_models(text: str) -> list[str]:
-    matched: list[str] = []
-    for model, patterns in _MODEL_PATTERNS.items():
-        if _contains_any(text, patterns):
-            matched.append(model)
-
-    if "sony" in text:
-        for token in _SONY_MODEL_TOKEN.findall(text):
-            normalized_token = _normalize_sony_token(token)
-            fallback_model = _GENERIC_SONY_ALIAS.get(normalized_token)
-            # Broad alpha coverage: a5000/a5100/a6000/a6100/... should not end up unknown.
-            if fallback_model is None:
-                m = _SONY_FOUR_DIGIT_ALPHA.fullmatch(normalized_token)
-                if m is not None:
-                    fallback_model = f"sony_a{m.group(1)}"
-            if fallback_model and fallback_model not in matched:
-                matched.append(fallback_model)
-
-    for token in _SONY_RX_MODEL_TOKEN.findall(text):
-        normalized_token = _normalize_rx_token(token)
-        fallback_model = _GENERIC_RX_ALIAS.get(normalized_token)
-        if fallback_model and fallback_model not in matched:
-            matched.append(fallback_model)
-
-    matched_set = set(matched)
-    for generic_model, specific_models in _GENERIC_MODEL_OVERRIDES.items():
-        if generic_model in matched_set and matched_set.intersection(specific_models):
-            matched_set.remove(generic_model)
-
-    return [model for model in matched if model in matched_set]
+    # text must already be lower-cased; the classifier patterns are case-sensitive
+    if _MODEL_TEXT_GATE.search(text) is None:
+        return []
+    found: set[str] = set()
+    # The generic Sony/RX tokens also start at a word that begins with "a", "rx1" or "sony",
+    # so they are matched at the same anchor hits instead of scanning the text twice more.
+    has_sony = "sony" in text
+    # tokens are kept as insertion-ordered sets: a listing that repeats "a7iv" five times
+    # only normalizes and looks it up once
+    sony_tokens: dict[str, None] = {}
+    rx_tokens: dict[str, None] = {}
+    for hit in _MODEL_TRIGGER_RE.finditer(text):
+        word = hit.group()
+        start = hit.start()
+        for model, match in _anchored_candidates(word):
+            if model not in found and match(text, start):
+                found.add(model)
+        if has_sony and word.startswith(("a", "sony")):
+            token_match = _SONY_MODEL_TOKEN.match(text, start)
+            if token_match is not None:
+                sony_tokens[token_match.group(1)] = None
+        if word.startswith(("rx1", "sony")):
+            token_match = _SONY_RX_MODEL_TOKEN.match(text, start)
+            if token_match is not None:
+                rx_tokens[token_match.group(1)] = None
+    # keep the declaration order of _MODEL_PATTERNS; the first match becomes detected_model.
+    # matched is an insertion-ordered set, so later additions and removals stay O(1)
+    matched = dict.fromkeys(model for model in _MODEL_PATTERNS if model in found)
+
+    for token in sony_tokens:
+        normalized_token = _normalize_sony_token(token)
+        fallback_model = _GENERIC_SONY_ALIAS.get(normalized_token)
+        # Broad alpha coverage: a5000/a5100/a6000/a6100/... should not end up unknown.
+        if fallback_model is None:
+            m = _SONY_FOUR_DIGIT_ALPHA.fullmatch(normalized_token)
+            if m is not None:
+                fallback_model = f"sony_a{m.group(1)}"
+        if fallback_model:
+            matched.setdefault(fallback_model)
+
+    for token in rx_tokens:
+        fallback_model = _GENERIC_RX_ALIAS.get(_normalize_rx_token(token))
+        if fallback_model:
+            matched.setdefault(fallback_model)
+
+    # an override needs both a generic and a more specific model
+    if len(matched) > 1:
+        for generic_model, specific_models in _GENERIC_MODEL_OVERRIDES.items():
+            if generic_model in matched and not specific_models.isdisjoint(matched):
+                del matched[generic_model]
+
+    return list(matched)
 
 
 def _target_model_from_item_name(item_name: str) -> str | None:
@@ -645,24 +870,42 @@ def _canonical_item_name(item_name: str, detected_model: str) -> str:
 
 
 def _detect_listing_type(text: str, matched_models: list[str]) -> str:
-    if _contains_any(text, _ACCESSORY_PATTERNS):
+    flags = 0
+    for hit in _LISTING_CATEGORY_RE.finditer(text):
+        # every alternative is a named group, so lastgroup is always set
+        if hit.lastgroup is not None:
+            flags |= _LISTING_CATEGORY_FLAGS[hit.lastgroup]
+        if flags & _ACCESSORY_FLAG:
+            return "accessory"
+
+    if matched_models and flags & _COMPATIBILITY_FLAG and not flags & _CAMERA_FLAG:
         return "accessory"
-    if matched_models and _contains_any(text, _COMPATIBILITY_PATTERNS) and not _contains_any(
-        text, _CAMERA_PATTERNS
-    ):
-        return "accessory"
-    if _contains_any(text, _LENS_PATTERNS) and not _contains_any(text, _CAMERA_PATTERNS):
+    if flags & _LENS_FLAG and not flags & _CAMERA_FLAG:
         return "lens"
-    if matched_models or _contains_any(text, _CAMERA_PATTERNS):
+    if matched_models or flags & _CAMERA_FLAG:
         return "camera_body"
     return "other"
 
 
+# Both results depend only on the listing text, and the same listing is observed again on
+# every search pass (dealers also repost identical text), so keep recent texts memoized.
+@functools.lru_cache(maxsize=4096)
+def _analyze_text(text: str) -> tuple[tuple[str, ...], str]:
+    matched_models = _extract_models(text)
+    return tuple(matched_models), _detect_listing_type(text, matched_models)
+
+
 def _classify_listing(listing: Listing, item_name: str) -> ListingClassification:
-    combined_text = " ".join([listing.title or "", listing.description or ""]).strip().lower()
+    return _classify_text(listing.title or "", listing.description or "", item_name)
+
+
+# Listing is not hashable, so the memoized classifier is keyed on the fields it reads;
+# re-observed listings then cost a single cache lookup
+@functools.lru_cache(maxsize=8192)
+def _classify_text(title: str, description: str, item_name: str) -> ListingClassification:
+    combined_text = " ".join([title, description]).strip().lower()
     target_model = _target_model_from_item_name(item_name)
-    matched_models = _extract_models(combined_text)
-    listing_type = _detect_listing_type(combined_text, matched_models)
+    matched_models, listing_type = _analyze_text(combined_text)
 
     detected_model = "unknown"
     if target_model and target_model in matched_models:
@@ -729,16 +972,86 @@ def _classify_listing(listing: Listing, item_name: str) -> ListingClassification
     )
 
 
+def _classification_update(row: tuple) -> tuple:
+    detected_model, listing_type, is_target_exact, confidence, reason = _classify_text(
+        str(row[4] or ""), str(row[10] or ""), str(row[2] or "")
+    )
+    canonical_item_name = _canonical_item_name(
+        item_name=str(row[2] or ""),
+        detected_model=detected_model,
+    )
+    return (
+        canonical_item_name,
+        detected_model,
+        listing_type,
+        is_target_exact,
+        confidence,
+        reason,
+        _classification_input_hash(
+            str(row[4] or ""), str(row[10] or ""), canonical_item_name
+        ),
+        row[0],
+    )
+
+
+def _classification_is_current(row: tuple) -> bool:
+    # row[11] is classification_reason, row[12] the stored classification_input_hash
+    return row[11] is not None and row[12] == _classification_input_hash(
+        str(row[4] or ""), str(row[10] or ""), str(row[2] or "")
+    )
+
+
 class MarketDataStore:
     def __init__(self: "MarketDataStore", db_path: Path) -> None:
         self.db_path = db_path
-        self._schema_ready = False
-
-    def _connect(self: "MarketDataStore") -> sqlite3.Connection:
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA journal_mode=WAL")
-        return conn
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        # (marketplace, listing_id) -> latest snapshot row, or None when the listing has no
+        # rows yet; dropped for a listing whenever it is observed again, and entirely by
+        # clear_snapshot_cache
+        self._snapshot_cache: dict[tuple[str, str], Optional[tuple]] = {}
+
+    @contextmanager
+    def _connect(self: "MarketDataStore") -> Iterator[sqlite3.Connection]:
+        # keep one connection per store instead of reopening the file and re-enabling WAL on
+        # every call; the lock serializes callers from different threads. The schema is
+        # checked once per opened connection, not by every public method.
+        with self._lock:
+            if self._conn is None:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                try:
+                    # WAL with synchronous=NORMAL syncs at checkpoints instead of on every
+                    # commit; a crash can lose the last commits but never corrupts the file
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    conn.execute("PRAGMA temp_store=MEMORY")
+                    conn.execute(f"PRAGMA mmap_size={_SQLITE_MMAP_SIZE}")
+                    # bound the ANALYZE work that PRAGMA optimize may do on a large table
+                    conn.execute(f"PRAGMA analysis_limit={_SQLITE_ANALYSIS_LIMIT}")
+                    self._ensure_schema(conn)
+                except Exception:
+                    conn.close()
+                    raise
+                self._conn = conn
+            with self._conn:
+                yield self._conn
+
+    def close(self: "MarketDataStore") -> None:
+        with self._lock:
+            if self._conn is not None:
+                # let SQLite analyze the tables this connection queried if their statistics are
+                # missing or stale, so the planner can pick the narrower indexes
+                self._conn.execute("PRAGMA optimize")
+                self._conn.close()
+                self._conn = None
+            self._snapshot_cache.clear()
+
+    def clear_snapshot_cache(self: "MarketDataStore") -> None:
+        # drops snapshots that other writers to the database may have made stale; called once
+        # per search pass
+        with self._lock:
+            self._snapshot_cache.clear()
 
     def _ensure_listing_observation_columns(self: "MarketDataStore", conn: sqlite3.Connection) -> None:
         existing_columns = {
@@ -751,6 +1064,7 @@ class MarketDataStore:
             "is_target_exact": "INTEGER NOT NULL DEFAULT 0",
             "classification_confidence": "REAL",
             "classification_reason": "TEXT",
+            "classification_input_hash": "TEXT",
         }
         for column_name, column_sql in required_columns.items():
             if column_name in existing_columns:
@@ -759,45 +1073,33 @@ class MarketDataStore:
                 f"ALTER TABLE listing_observations ADD COLUMN {column_name} {column_sql}"
             )
 
-    def _backfill_classification(self: "MarketDataStore", conn: sqlite3.Connection) -> None:
-        rows = conn.execute(
-            """
-            SELECT
-                id,
-                marketplace,
-                item_name,
-                listing_id,
-                title,
-                post_url,
-                price_text,
-                location,
-                seller,
-                item_condition,
-                description
-            FROM listing_observations
-            WHERE classification_reason IS NULL
-            """
-        ).fetchall()
-        for row in rows:
-            listing = Listing(
-                marketplace=str(row[1] or ""),
-                name=str(row[2] or ""),
-                id=str(row[3] or ""),
-                title=str(row[4] or ""),
-                image="",
-                price=str(row[6] or ""),
-                post_url=str(row[5] or ""),
-                location=str(row[7] or ""),
-                seller=str(row[8] or ""),
-                condition=str(row[9] or ""),
-                description=str(row[10] or ""),
-            )
-            classification = _classify_listing(listing, str(row[2] or ""))
-            canonical_item_name = _canonical_item_name(
-                item_name=str(row[2] or ""),
-                detected_model=classification.detected_model,
-            )
-            conn.execute(
+    def _reclassify_matching(
+        self: "MarketDataStore",
+        conn: sqlite3.Connection,
+        select_sql: str,
+        executor: Optional[Executor] = None,
+    ) -> int:
+        # page through matching rows by id so only one batch is held in memory, and write each
+        # batch with a single executemany inside the caller's transaction
+        updated = 0
+        last_id = 0
+        while True:
+            rows = conn.execute(select_sql, (last_id, _RECLASSIFY_BATCH_SIZE)).fetchall()
+            if not rows:
+                return updated
+            last_id = int(rows[-1][0])
+            # rows already classified by this classifier from the same text would come out the
+            # same again, so only the rest are classified
+            pending = [row for row in rows if not _classification_is_current(row)]
+            if not pending:
+                continue
+            if executor is None:
+                updates = [_classification_update(row) for row in pending]
+            else:
+                # classification is pure CPU work on plain row tuples, so it can run in worker
+                # processes while this connection stays the only writer
+                updates = list(executor.map(_classification_update, pending, chunksize=64))
+            conn.executemany(
                 """
                 UPDATE listing_observations
                 SET
@@ -806,87 +1108,30 @@ class MarketDataStore:
                     listing_type = ?,
                     is_target_exact = ?,
                     classification_confidence = ?,
-                    classification_reason = ?
+                    classification_reason = ?,
+                    classification_input_hash = ?
                 WHERE id = ?
                 """,
-                (
-                    canonical_item_name,
-                    classification.detected_model,
-                    classification.listing_type,
-                    classification.is_target_exact,
-                    classification.confidence,
-                    classification.reason,
-                    row[0],
-                ),
+                updates,
             )
+            updated += len(updates)
 
-    def reclassify_unknown_rows(self: "MarketDataStore") -> int:
+    def _backfill_classification(self: "MarketDataStore", conn: sqlite3.Connection) -> None:
+        self._reclassify_matching(conn, _SELECT_UNCLASSIFIED_SQL)
+
+    def reclassify_unknown_rows(self: "MarketDataStore", workers: int = 1) -> int:
         with self._connect() as conn:
-            self._ensure_schema(conn)
-            rows = conn.execute(
-                """
-                SELECT
-                    id,
-                    marketplace,
-                    item_name,
-                    listing_id,
-                    title,
-                    post_url,
-                    price_text,
-                    location,
-                    seller,
-                    item_condition,
-                    description
-                FROM listing_observations
-                WHERE COALESCE(detected_model, 'unknown') = 'unknown'
-                   OR classification_reason IS NULL
-                """
-            ).fetchall()
-
-            updated = 0
-            for row in rows:
-                listing = Listing(
-                    marketplace=str(row[1] or ""),
-                    name=str(row[2] or ""),
-                    id=str(row[3] or ""),
-                    title=str(row[4] or ""),
-                    image="",
-                    price=str(row[6] or ""),
-                    post_url=str(row[5] or ""),
-                    location=str(row[7] or ""),
-                    seller=str(row[8] or ""),
-                    condition=str(row[9] or ""),
-                    description=str(row[10] or ""),
-                )
-                classification = _classify_listing(listing, str(row[2] or ""))
-                canonical_item_name = _canonical_item_name(
-                    item_name=str(row[2] or ""),
-                    detected_model=classification.detected_model,
-                )
-                conn.execute(
-                    """
-                    UPDATE listing_observations
-                    SET
-                        item_name = ?,
-                        detected_model = ?,
-                        listing_type = ?,
-                        is_target_exact = ?,
-                        classification_confidence = ?,
-                        classification_reason = ?
-                    WHERE id = ?
-                    """,
-                    (
-                        canonical_item_name,
-                        classification.detected_model,
-                        classification.listing_type,
-                        classification.is_target_exact,
-                        classification.confidence,
-                        classification.reason,
-                        row[0],
-                    ),
-                )
-                updated += 1
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    updated = self._reclassify_matching(
+                        conn, _SELECT_UNKNOWN_OR_UNCLASSIFIED_SQL, executor
+                    )
+            else:
+                updated = self._reclassify_matching(conn, _SELECT_UNKNOWN_OR_UNCLASSIFIED_SQL)
             conn.commit()
+            if updated:
+                # reclassification may rewrite item_name, which snapshots carry
+                self._snapshot_cache.clear()
             return updated
 
     def has_observation(
@@ -895,88 +1140,93 @@ class MarketDataStore:
         listing_id: str,
         availability: str | None = None,
     ) -> bool:
+        if availability is None:
+            return any(self.observation_flags(marketplace, listing_id))
+        if availability == "out":
+            return self.observation_flags(marketplace, listing_id)[0]
+        # observation_flags folds every non-out state together, so a specific one is
+        # looked up on its own
         with self._connect() as conn:
-            self._ensure_schema(conn)
-            if availability is None:
-                row = conn.execute(
-                    """
-                    SELECT 1
-                    FROM listing_observations
-                    WHERE marketplace = ? AND listing_id = ?
-                    LIMIT 1
-                    """,
-                    (marketplace, listing_id),
-                ).fetchone()
-            else:
-                row = conn.execute(
-                    """
+            row = conn.execute(
+                """
+                SELECT EXISTS(
                     SELECT 1
                     FROM listing_observations
                     WHERE marketplace = ? AND listing_id = ? AND availability = ?
-                    LIMIT 1
-                    """,
-                    (marketplace, listing_id, availability),
-                ).fetchone()
-            return row is not None
+                )
+                """,
+                (marketplace, listing_id, availability),
+            ).fetchone()
+            return bool(row[0])
 
     def has_non_out_observation(self: "MarketDataStore", marketplace: str, listing_id: str) -> bool:
+        return self.observation_flags(marketplace, listing_id)[1]
+
+    def observation_flags(
+        self: "MarketDataStore", marketplace: str, listing_id: str
+    ) -> Tuple[bool, bool]:
+        # both flags are answered in one round-trip
         with self._connect() as conn:
-            self._ensure_schema(conn)
-            row = conn.execute(
-                """
-                SELECT 1
-                FROM listing_observations
-                WHERE marketplace = ? AND listing_id = ? AND availability != 'out'
-                LIMIT 1
-                """,
-                (marketplace, listing_id),
-            ).fetchone()
-            return row is not None
+            row = conn.execute(_OBSERVATION_FLAGS_SQL, (marketplace, listing_id)).fetchone()
+            return bool(row[0]), bool(row[1])
 
     def get_latest_listing_snapshot(
         self: "MarketDataStore", marketplace: str, listing_id: str
     ) -> Listing | None:
-        with self._connect() as conn:
-            self._ensure_schema(conn)
-            row = conn.execute(
-                """
-                SELECT
-                    marketplace,
-                    item_name,
-                    listing_id,
-                    title,
-                    post_url,
-                    price_text,
-                    location,
-                    seller,
-                    item_condition,
-                    description
-                FROM listing_observations
-                WHERE marketplace = ? AND listing_id = ?
-                ORDER BY observed_at DESC
-                LIMIT 1
-                """,
-                (marketplace, listing_id),
-            ).fetchone()
-            if row is None:
-                return None
-
-            return Listing(
-                marketplace=str(row[0] or ""),
-                name=str(row[1] or ""),
-                id=str(row[2] or ""),
-                title=str(row[3] or ""),
-                image="",
-                post_url=str(row[4] or ""),
-                price=str(row[5] or ""),
-                location=str(row[6] or ""),
-                seller=str(row[7] or ""),
-                condition=str(row[8] or ""),
-                description=str(row[9] or ""),
-            )
+        key = (marketplace, listing_id)
+        row: Optional[tuple]
+        try:
+            # a hit is a plain dict read: no lock, no transaction
+            row = self._snapshot_cache[key]
+        except KeyError:
+            with self._connect() as conn:
+                row = conn.execute(
+                    """
+                    SELECT
+                        marketplace,
+                        item_name,
+                        listing_id,
+                        title,
+                        post_url,
+                        price_text,
+                        location,
+                        seller,
+                        item_condition,
+                        description
+                    FROM listing_observations
+                    WHERE marketplace = ? AND listing_id = ?
+                    ORDER BY observed_at DESC
+                    LIMIT 1
+                    """,
+                    key,
+                ).fetchone()
+                if len(self._snapshot_cache) >= _SNAPSHOT_CACHE_SIZE:
+                    del self._snapshot_cache[next(iter(self._snapshot_cache))]
+                self._snapshot_cache[key] = row
+        if row is None:
+            return None
+
+        # a fresh Listing per call, so callers can never mutate the cached snapshot; the
+        # columns are TEXT, so only the nullable ones need a default
+        _, name, _, title, post_url, price, location, seller, condition, description = row
+        return Listing(
+            marketplace=marketplace,
+            name=name or "",
+            id=listing_id,
+            title=title or "",
+            image="",
+            post_url=post_url or "",
+            price=price or "",
+            location=location or "",
+            seller=seller or "",
+            condition=condition or "",
+            description=description or "",
+        )
 
     def _ensure_schema(self: "MarketDataStore", conn: sqlite3.Connection) -> None:
-        if self._schema_ready:
+        # the column migration and classification backfill scan the table, so they run once
+        # per database file; bump _SCHEMA_VERSION whenever the steps below change
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
             return
 
         conn.executescript(
@@ -1003,6 +1253,7 @@ class MarketDataStore:
                 is_target_exact INTEGER NOT NULL DEFAULT 0,
                 classification_confidence REAL,
                 classification_reason TEXT,
+                classification_input_hash TEXT,
                 availability TEXT NOT NULL,
                 sold_estimated_at TEXT,
                 sold_time_method TEXT,
@@ -1015,6 +1266,12 @@ class MarketDataStore:
             CREATE INDEX IF NOT EXISTS idx_listing_obs_sold_time
                 ON listing_observations(sold_estimated_at, observed_at);
 
+            CREATE INDEX IF NOT EXISTS idx_listing_obs_listing
+                ON listing_observations(marketplace, listing_id, availability, observed_at);
+
+            CREATE INDEX IF NOT EXISTS idx_listing_obs_snapshot
+                ON listing_observations(marketplace, listing_id, observed_at DESC);
+
             CREATE TABLE IF NOT EXISTS market_price (
                 item_name TEXT NOT NULL,
                 marketplace TEXT NOT NULL,
@@ -1036,8 +1293,56 @@ class MarketDataStore:
             ON listing_observations(item_name, marketplace, search_city, availability, is_target_exact);
             """
         )
+        # partial index over rows that still need (re)classification, so counting and
+        # selecting them does not scan the whole table
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_listing_obs_unknown
+            ON listing_observations(detected_model)
+            WHERE COALESCE(detected_model, 'unknown') = 'unknown'
+               OR classification_reason IS NULL;
+            """
+        )
+        # only sold rows, which are a small share of all observations; serves the sold-row
+        # side of refresh_market_price with marketplace/city/model/listing equality lookups
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_listing_obs_sold
+            ON listing_observations(
+                marketplace,
+                search_city,
+                detected_model,
+                listing_id,
+                observed_at,
+                listing_type,
+                sold_estimated_at,
+                price_value,
+                currency
+            )
+            WHERE availability = 'out';
+            """
+        )
+        # covers refresh_market_price: it groups a (marketplace, search_city) slice by listing
+        # and takes the latest observed_at, and every column it reads is in the index
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_listing_obs_latest
+            ON listing_observations(
+                marketplace,
+                search_city,
+                listing_id,
+                observed_at DESC,
+                availability,
+                detected_model,
+                listing_type,
+                price_value,
+                currency,
+                sold_estimated_at
+            );
+            """
+        )
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
         conn.commit()
-        self._schema_ready = True
 
     def _estimate_sold_time(
         self: "MarketDataStore",
@@ -1046,36 +1351,47 @@ class MarketDataStore:
         listing_id: str,
         observed_at: str,
     ) -> Tuple[str, str]:
-        existing = conn.execute(
+        # first estimated sold row (both columns come from the same row: out observations of
+        # a listing have distinct observed_at) and last active sighting, in one round-trip
+        row = conn.execute(
             """
-            SELECT sold_estimated_at, sold_time_method
-            FROM listing_observations
-            WHERE marketplace = ? AND listing_id = ? AND availability = 'out'
-              AND sold_estimated_at IS NOT NULL
-            ORDER BY observed_at ASC
-            LIMIT 1
-            """,
-            (marketplace, listing_id),
-        ).fetchone()
-        if existing is not None:
-            return str(existing[0]), str(existing[1] or "first_seen_out_of_stock")
-
-        last_active = conn.execute(
-            """
-            SELECT observed_at
-            FROM listing_observations
-            WHERE marketplace = ? AND listing_id = ? AND availability != 'out'
-            ORDER BY observed_at DESC
-            LIMIT 1
+            SELECT
+                (
+                    SELECT sold_estimated_at
+                    FROM listing_observations
+                    WHERE marketplace = ?1 AND listing_id = ?2 AND availability = 'out'
+                      AND sold_estimated_at IS NOT NULL
+                    ORDER BY observed_at ASC
+                    LIMIT 1
+                ),
+                (
+                    SELECT sold_time_method
+                    FROM listing_observations
+                    WHERE marketplace = ?1 AND listing_id = ?2 AND availability = 'out'
+                      AND sold_estimated_at IS NOT NULL
+                    ORDER BY observed_at ASC
+                    LIMIT 1
+                ),
+                (
+                    SELECT observed_at
+                    FROM listing_observations
+                    WHERE marketplace = ?1 AND listing_id = ?2 AND availability != 'out'
+                    ORDER BY observed_at DESC
+                    LIMIT 1
+                )
             """,
             (marketplace, listing_id),
         ).fetchone()
+        existing_sold_at, existing_method, last_active = row
+        if existing_sold_at is not None:
+            return str(existing_sold_at), str(existing_method or "first_seen_out_of_stock")
         if last_active is None:
             return observed_at, "first_seen_out_of_stock"
 
-        last_active_ts = _parse_datetime(str(last_active[0]))
-        first_sold_ts = _parse_datetime(observed_at)
-        midpoint = last_active_ts + (first_sold_ts - last_active_ts) / 2
+        # stored timestamps are whole seconds, so averaging the epoch values is exact
+        last_active_ts = _parse_datetime(str(last_active)).timestamp()
+        first_sold_ts = _parse_datetime(observed_at).timestamp()
+        midpoint = datetime.fromtimestamp((last_active_ts + first_sold_ts) / 2, tz=timezone.utc)
         return midpoint.isoformat(), "midpoint_last_active_and_first_sold"
 
     def record_observation(
@@ -1086,28 +1402,87 @@ class MarketDataStore:
         search_phrase: str,
         availability: str,
     ) -> None:
+        self.record_observations([(listing, item_name, search_city, search_phrase, availability)])
+
+    def record_observations(
+        self: "MarketDataStore",
+        observations: Iterable[Tuple[Listing, str, str, str, str]],
+    ) -> None:
+        # (listing, item_name, search_city, search_phrase, availability) tuples from one search
+        # pass are written with a single executemany and one commit
         observed_at = _utc_now_iso()
-        price_value, currency = _parse_price(listing.price)
-        classification = _classify_listing(listing, item_name)
-        canonical_item_name = _canonical_item_name(
-            item_name=item_name,
-            detected_model=classification.detected_model,
-        )
+        prepared = []
+        for listing, item_name, search_city, search_phrase, availability in observations:
+            classification = _classify_listing(listing, item_name)
+            canonical_item_name = _canonical_item_name(
+                item_name=item_name,
+                detected_model=classification.detected_model,
+            )
+            prepared.append(
+                (
+                    listing,
+                    canonical_item_name,
+                    search_city,
+                    search_phrase,
+                    availability,
+                    classification,
+                )
+            )
+        if not prepared:
+            return
 
         with self._connect() as conn:
-            self._ensure_schema(conn)
-
-            sold_estimated_at = None
-            sold_time_method = None
-            if availability == "out":
-                sold_estimated_at, sold_time_method = self._estimate_sold_time(
-                    conn=conn,
-                    marketplace=listing.marketplace,
-                    listing_id=listing.id,
-                    observed_at=observed_at,
+            rows = []
+            for (
+                listing,
+                canonical_item_name,
+                search_city,
+                search_phrase,
+                availability,
+                classification,
+            ) in prepared:
+                price_value, currency = _parse_price(listing.price)
+                sold_estimated_at = None
+                sold_time_method = None
+                if availability == "out":
+                    sold_estimated_at, sold_time_method = self._estimate_sold_time(
+                        conn=conn,
+                        marketplace=listing.marketplace,
+                        listing_id=listing.id,
+                        observed_at=observed_at,
+                    )
+                rows.append(
+                    (
+                        observed_at,
+                        listing.marketplace,
+                        canonical_item_name,
+                        search_city,
+                        search_phrase,
+                        listing.id,
+                        listing.post_url.partition("?")[0],
+                        listing.title,
+                        listing.price,
+                        price_value,
+                        currency,
+                        listing.location,
+                        listing.seller,
+                        listing.condition,
+                        listing.description,
+                        classification.detected_model,
+                        classification.listing_type,
+                        classification.is_target_exact,
+                        classification.confidence,
+                        classification.reason,
+                        _classification_input_hash(
+                            listing.title, listing.description, canonical_item_name
+                        ),
+                        availability,
+                        sold_estimated_at,
+                        sold_time_method,
+                    )
                 )
 
-            conn.execute(
+            conn.executemany(
                 """
                 INSERT OR IGNORE INTO listing_observations (
                     observed_at,
@@ -1130,38 +1505,17 @@ class MarketDataStore:
                     is_target_exact,
                     classification_confidence,
                     classification_reason,
+                    classification_input_hash,
                     availability,
                     sold_estimated_at,
                     sold_time_method
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    observed_at,
-                    listing.marketplace,
-                    canonical_item_name,
-                    search_city,
-                    search_phrase,
-                    listing.id,
-                    listing.post_url.split("?")[0],
-                    listing.title,
-                    listing.price,
-                    price_value,
-                    currency,
-                    listing.location,
-                    listing.seller,
-                    listing.condition,
-                    listing.description,
-                    classification.detected_model,
-                    classification.listing_type,
-                    classification.is_target_exact,
-                    classification.confidence,
-                    classification.reason,
-                    availability,
-                    sold_estimated_at,
-                    sold_time_method,
-                ),
+                rows,
             )
             conn.commit()
+            for listing, *_ in prepared:
+                self._snapshot_cache.pop((listing.marketplace, listing.id), None)
 
     def refresh_market_price(
         self: "MarketDataStore",
@@ -1174,50 +1528,60 @@ class MarketDataStore:
         cutoff = (now - timedelta(days=window_days)).isoformat()
 
         with self._connect() as conn:
-            self._ensure_schema(conn)
-
+            # read the sold slice and write the aggregate in one write transaction, so the
+            # estimate is computed from a single snapshot and no observation lands in between
+            conn.execute("BEGIN IMMEDIATE")
+
+            # One pass over the slice. The price average uses the latest priced sold row of
+            # each listing, while the modal currency uses the latest sold row whether or not
+            # it carries a price. The latest rows are picked with MAX(observed_at) per
+            # listing; SQLite takes the bare columns of such a query from the row holding the
+            # maximum, which the index serves directly instead of sorting for a window.
             row = conn.execute(
                 """
                 WITH latest_listing_state AS (
-                    SELECT
-                        listing_id,
-                        availability,
-                        observed_at,
-                        ROW_NUMBER() OVER (
-                            PARTITION BY listing_id
-                            ORDER BY observed_at DESC
-                        ) AS rn
+                    SELECT listing_id, availability, MAX(observed_at) AS observed_at
                     FROM listing_observations
                     WHERE marketplace = ?
                       AND search_city = ?
+                    GROUP BY listing_id
                 ),
-                latest_sold_row_per_listing AS (
-                    SELECT
-                        o.listing_id,
-                        o.price_value,
-                        o.currency,
-                        o.observed_at,
-                        o.sold_estimated_at,
-                        ROW_NUMBER() OVER (
-                            PARTITION BY o.listing_id
-                            ORDER BY o.observed_at DESC
-                        ) AS rn
+                sold_rows AS (
+                    SELECT o.listing_id, o.observed_at, o.price_value, o.currency
                     FROM listing_observations o
                     JOIN latest_listing_state s
                       ON s.listing_id = o.listing_id
-                     AND s.rn = 1
                      AND s.availability = 'out'
                     WHERE o.marketplace = ?
                       AND o.search_city = ?
                       AND o.availability = 'out'
                       AND COALESCE(o.sold_estimated_at, o.observed_at) >= ?
-                      AND o.price_value IS NOT NULL
                       AND COALESCE(o.listing_type, 'other') = 'camera_body'
                       AND o.detected_model = ?
+                ),
+                latest_priced_row AS (
+                    SELECT price_value, MAX(observed_at) AS observed_at
+                    FROM sold_rows
+                    WHERE price_value IS NOT NULL
+                    GROUP BY listing_id
+                ),
+                latest_sold_row AS (
+                    SELECT currency, MAX(observed_at) AS observed_at
+                    FROM sold_rows
+                    GROUP BY listing_id
                 )
-                SELECT COUNT(price_value), AVG(price_value)
-                FROM latest_sold_row_per_listing
-                WHERE rn = 1
+                SELECT
+                    COUNT(price_value),
+                    AVG(price_value),
+                    (
+                        SELECT currency
+                        FROM latest_sold_row
+                        WHERE currency IS NOT NULL
+                        GROUP BY currency
+                        ORDER BY COUNT(*) DESC, currency ASC
+                        LIMIT 1
+                    )
+                FROM latest_priced_row
                 """,
                 (
                     marketplace,
@@ -1233,62 +1597,7 @@ class MarketDataStore:
             msrp_estimate = (
                 float(row[1]) if row is not None and row[1] is not None else None
             )
-
-            currency_row = conn.execute(
-                """
-                WITH latest_listing_state AS (
-                    SELECT
-                        listing_id,
-                        availability,
-                        observed_at,
-                        ROW_NUMBER() OVER (
-                            PARTITION BY listing_id
-                            ORDER BY observed_at DESC
-                        ) AS rn
-                    FROM listing_observations
-                    WHERE marketplace = ?
-                      AND search_city = ?
-                ),
-                latest_sold_row_per_listing AS (
-                    SELECT
-                        o.listing_id,
-                        o.currency,
-                        o.observed_at,
-                        o.sold_estimated_at,
-                        ROW_NUMBER() OVER (
-                            PARTITION BY o.listing_id
-                            ORDER BY o.observed_at DESC
-                        ) AS rn
-                    FROM listing_observations o
-                    JOIN latest_listing_state s
-                      ON s.listing_id = o.listing_id
-                     AND s.rn = 1
-                     AND s.availability = 'out'
-                    WHERE o.marketplace = ?
-                      AND o.search_city = ?
-                      AND o.availability = 'out'
-                      AND COALESCE(o.sold_estimated_at, o.observed_at) >= ?
-                      AND COALESCE(o.listing_type, 'other') = 'camera_body'
-                      AND o.detected_model = ?
-                )
-                SELECT currency, COUNT(*) AS cnt
-                FROM latest_sold_row_per_listing
-                WHERE rn = 1
-                  AND currency IS NOT NULL
-                GROUP BY currency
-                ORDER BY cnt DESC, currency ASC
-                LIMIT 1
-                """,
-                (
-                    marketplace,
-                    search_city,
-                    marketplace,
-                    search_city,
-                    cutoff,
-                    item_name,
-                ),
-            ).fetchone()
-            currency = str(currency_row[0]) if currency_row is not None else None
+            currency = str(row[2]) if row is not None and row[2] is not None else None
 
             conn.execute(
                 """
@@ -1321,15 +1630,18 @@ class MarketDataStore:
                 ),
             )
             conn.commit()
+            # the shared store is rarely closed, so statistics are also refreshed here, after
+            # each sold pass; this is a no-op unless the sold rows queried above have no or
+            # stale statistics, which would keep the planner off idx_listing_obs_sold
+            conn.execute("PRAGMA optimize")
 
         return sample_size, msrp_estimate, currency
 
 
-_market_data_store: MarketDataStore | None = None
-
-
+@functools.cache
 def get_market_data_store() -> MarketDataStore:
-    global _market_data_store
-    if _market_data_store is None:
-        _market_data_store = MarketDataStore(amm_home / "market_data.db")
-    return _market_data_store
+    store = MarketDataStore(amm_home / "market_data.db")
+    # the shared store lives as long as the process, so close it at exit; that is what runs
+    # the close-time PRAGMA optimize for the monitor
+    atexit.register(store.close)
+    return store
@@ -69,8 +69,7 @@ def facebook_marketplace(monkeypatch: pytest.MonkeyPatch) -> FacebookMarketplace
         condition="used_good",
         description="Great condition camera body.",
     )
-    market_store.has_observation.return_value = False
-    market_store.has_non_out_observation.return_value = False
+    market_store.observation_flags.return_value = (False, False)
 
     monkeypatch.setattr(
         "ai_marketplace_monitor.facebook.FacebookSearchResultPage",
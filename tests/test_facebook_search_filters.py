@@ -1,3 +1,4 @@
+import sqlite3
 from types import SimpleNamespace
 from unittest.mock import MagicMock
 
@@ -160,8 +161,7 @@ def test_sold_pass_skips_non_sold_results_without_explicit_sold_marker(
         condition="used_good",
         description="In very good condition",
     )
-    market_store.has_observation.return_value = False
-    market_store.has_non_out_observation.return_value = False
+    market_store.observation_flags.return_value = (False, False)
     market_store.refresh_market_price.return_value = (0, None, None)
 
     monkeypatch.setattr(
@@ -193,4 +193,23 @@ def test_sold_pass_skips_non_sold_results_without_explicit_sold_marker(
 
     list(marketplace.search(item_config))
 
+    market_store.record_observations.assert_not_called()
     market_store.record_observation.assert_not_called()
+
+
+def test_flush_observations_retries_rows_one_by_one_after_batch_failure() -> None:
+    marketplace = FacebookMarketplace(name="facebook", browser=MagicMock(), logger=MagicMock())
+    market_store = MagicMock()
+    market_store.record_observations.side_effect = sqlite3.OperationalError("batch failed")
+    market_store.record_observation.side_effect = [None, ValueError("bad row"), None]
+    pending = [
+        (MagicMock(id=str(index)), "sony_a7c2", "vancouver", "sony a7c2", "out")
+        for index in range(3)
+    ]
+    rows = list(pending)
+
+    recorded = marketplace._flush_observations(market_store, pending)
+
+    assert recorded == 2
+    assert pending == []
+    assert [call.args for call in market_store.record_observation.call_args_list] == rows
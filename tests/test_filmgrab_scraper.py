@@ -1,10 +1,19 @@
 """Tests for FilmGrab Wong Kar Wai scraper utilities."""
 
+import os
+import stat
+from pathlib import Path
+
+import pytest
+import requests
+
+from ai_marketplace_monitor import filmgrab_scraper
 from ai_marketplace_monitor.filmgrab_scraper import (
     build_category_url,
     extract_images,
     extract_next_page_url,
     extract_post_links,
+    extract_post_links_and_next,
     extract_zip_links,
     normalize_director_slug,
     resolve_category_and_output,
@@ -45,6 +54,26 @@ def test_extract_next_page_url() -> None:
     assert next_page == "https://film-grab.com/category/wong-kar-wai/page/2/"
 
 
+def test_extract_post_links_and_next_from_one_page() -> None:
+    html = """
+    <html><head>
+      <link rel="next" href="https://film-grab.com/category/wong-kar-wai/page/3/" />
+    </head><body>
+      <a href="/2014/10/20/chungking-express">Chungking</a>
+      <a class="next page-numbers" href="/category/wong-kar-wai/page/2/">Next</a>
+    </body></html>
+    """
+
+    links, next_page = extract_post_links_and_next(
+        html,
+        "https://film-grab.com/category/wong-kar-wai/",
+        "https://film-grab.com",
+    )
+
+    assert links == ["https://film-grab.com/2014/10/20/chungking-express/"]
+    assert next_page == "https://film-grab.com/category/wong-kar-wai/page/2/"
+
+
 def test_extract_zip_links_detects_download_archives() -> None:
     html = """
     <html><body>
@@ -100,6 +129,41 @@ def test_extract_images_supports_spaces_and_ignores_thumbs() -> None:
     ]
 
 
+def test_extract_images_reads_srcset_and_escaped_script_urls() -> None:
+    html = """
+    <html><body>
+      <img srcset="/wp-content/uploads/photo-gallery/fallen/image-01.jpg 1x" />
+      <script>
+        var gallery = {&quot;url&quot;: &quot;https://film-grab.com/wp-content/uploads/photo-gallery/fallen/image-02.jpg&quot;};
+      </script>
+    </body></html>
+    """
+
+    images = extract_images(html)
+
+    # absolute mentions come first, then relative ones, as file names have always been numbered
+    assert images == [
+        "https://film-grab.com/wp-content/uploads/photo-gallery/fallen/image-02.jpg",
+        "https://film-grab.com/wp-content/uploads/photo-gallery/fallen/image-01.jpg",
+    ]
+
+
+def test_extract_images_reads_comments_and_unescapes_text_once() -> None:
+    html = """
+    <html><body>
+      <!-- https://film-grab.com/wp-content/uploads/photo-gallery/fallen/image-01.jpg -->
+      <p>https://film-grab.com/wp-content/uploads/photo-gallery/fallen/a&amp;lt;b.jpg</p>
+    </body></html>
+    """
+
+    parser = filmgrab_scraper._parse_page(html)
+
+    assert parser.media_urls == [
+        "https://film-grab.com/wp-content/uploads/photo-gallery/fallen/image-01.jpg",
+        "https://film-grab.com/wp-content/uploads/photo-gallery/fallen/a&lt;b.jpg",
+    ]
+
+
 def test_normalize_director_slug_from_name() -> None:
     assert normalize_director_slug("Ye Lou") == "ye-lou"
     assert normalize_director_slug("Wong Kar-wai") == "wong-kar-wai"
@@ -129,3 +193,258 @@ def test_resolve_category_and_output_respects_explicit_overrides() -> None:
     assert director_slug == "ye-lou"
     assert category_url == "https://film-grab.com/category/custom-director/"
     assert str(output_dir) == "downloads/filmgrab/custom"
+
+
+class _FakeDownloadFile:
+    # stands in for _download_file; raises the mapped error for URLs containing a marker
+    def __init__(self, failures: dict[str, Exception]) -> None:
+        self.failures = failures
+        self.downloaded: list[tuple[str, Path]] = []
+
+    def __call__(
+        self,
+        session: requests.Session,
+        url: str,
+        out_path: Path,
+        timeout: int,
+        referer: str | None,
+        skip_existing: bool,
+    ) -> bool:
+        for marker, error in self.failures.items():
+            if marker in url:
+                raise error
+        self.downloaded.append((url, out_path))
+        return True
+
+
+def test_scrape_category_downloads_images_concurrently(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    category_html = """
+    <html><body><a href="/2014/10/20/chungking-express/">Chungking</a></body></html>
+    """
+    post_html = """
+    <html><body>
+      <h1>Chungking Express</h1>
+      <img src="https://film-grab.com/wp-content/uploads/photo-gallery/chungking/image-01.jpg" />
+      <img src="https://film-grab.com/wp-content/uploads/photo-gallery/chungking/image-02.png" />
+      <img src="https://film-grab.com/wp-content/uploads/photo-gallery/chungking/image-03.jpg" />
+    </body></html>
+    """
+    pages = {
+        "https://film-grab.com/category/wong-kar-wai/": category_html,
+        "https://film-grab.com/2014/10/20/chungking-express/": post_html,
+    }
+    fake_download_file = _FakeDownloadFile({"image-02.png": requests.ConnectionError("boom")})
+
+    monkeypatch.setattr(filmgrab_scraper, "_request_text", lambda session, url, timeout: pages[url])
+    monkeypatch.setattr(filmgrab_scraper, "_download_file", fake_download_file)
+
+    report = filmgrab_scraper.scrape_category(
+        category_url="https://film-grab.com/category/wong-kar-wai/",
+        output_dir=tmp_path,
+        item_delay_max=0,
+        page_delay_max=0,
+        max_workers=3,
+    )
+
+    film = report["films"][0]
+    assert film["title"] == "Chungking Express"
+    assert film["image_count"] == 3
+    assert film["downloaded_images"] == 2
+    assert film["errors"] == [
+        (
+            "Image download failed: "
+            "https://film-grab.com/wp-content/uploads/photo-gallery/chungking/image-02.png (boom)"
+        )
+    ]
+    assert sorted(out_path.name for _, out_path in fake_download_file.downloaded) == [
+        "001.jpg",
+        "003.jpg",
+    ]
+
+
+def test_scrape_category_suffixes_colliding_zip_names_and_records_disk_errors(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    category_html = """
+    <html><body><a href="/2014/10/20/chungking-express/">Chungking</a></body></html>
+    """
+    post_html = """
+    <html><body>
+      <h1>Chungking Express</h1>
+      <a href="https://film-grab.com/wp-content/uploads/photo-gallery/2020/01/Gallery.zip">1</a>
+      <a href="https://film-grab.com/wp-content/uploads/photo-gallery/2021/05/Gallery.zip">2</a>
+      <a href="https://film-grab.com/wp-content/uploads/photo-gallery/2022/03/Gallery.zip">3</a>
+    </body></html>
+    """
+    pages = {
+        "https://film-grab.com/category/wong-kar-wai/": category_html,
+        "https://film-grab.com/2014/10/20/chungking-express/": post_html,
+    }
+    fake_download_file = _FakeDownloadFile({"/2022/": OSError("disk full")})
+
+    monkeypatch.setattr(filmgrab_scraper, "_request_text", lambda session, url, timeout: pages[url])
+    monkeypatch.setattr(filmgrab_scraper, "_download_file", fake_download_file)
+
+    report = filmgrab_scraper.scrape_category(
+        category_url="https://film-grab.com/category/wong-kar-wai/",
+        output_dir=tmp_path,
+        download_mode="zip",
+        item_delay_max=0,
+        page_delay_max=0,
+        max_workers=3,
+    )
+
+    film = report["films"][0]
+    assert film["downloaded_zips"] == 2
+    assert film["errors"] == [
+        (
+            "ZIP download failed: "
+            "https://film-grab.com/wp-content/uploads/photo-gallery/2022/03/Gallery.zip (disk full)"
+        )
+    ]
+    assert sorted(out_path.name for _, out_path in fake_download_file.downloaded) == [
+        "Gallery-2.zip",
+        "Gallery.zip",
+    ]
+
+
+class _FakeStreamResponse:
+    def __init__(
+        self,
+        chunks: list[bytes],
+        fail_after: int | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.headers = headers or {}
+
+    def __enter__(self) -> "_FakeStreamResponse":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        return None
+
+    def raise_for_status(self) -> None:
+        return None
+
+    def iter_content(self, chunk_size: int):
+        for index, chunk in enumerate(self.chunks):
+            if self.fail_after is not None and index >= self.fail_after:
+                raise requests.ConnectionError("connection reset")
+            yield chunk
+
+
+class _FakeSession:
+    def __init__(self, response: _FakeStreamResponse) -> None:
+        self.response = response
+        self.calls: list[dict] = []
+
+    def get(self, url: str, **kwargs) -> _FakeStreamResponse:
+        self.calls.append({"url": url, **kwargs})
+        return self.response
+
+
+def test_download_file_streams_chunks_to_disk(tmp_path: Path) -> None:
+    session = _FakeSession(_FakeStreamResponse([b"PK", b"\x03\x04", b"data"]))
+    out_path = tmp_path / "film" / "gallery.zip"
+
+    saved = filmgrab_scraper._download_file(
+        session=session,
+        url="https://film-grab.com/gallery.zip",
+        out_path=out_path,
+        timeout=10,
+        referer="https://film-grab.com/post/",
+        skip_existing=True,
+    )
+
+    assert saved is True
+    assert out_path.read_bytes() == b"PK\x03\x04data"
+    assert session.calls[0]["stream"] is True
+    assert session.calls[0]["headers"] == {"Referer": "https://film-grab.com/post/"}
+
+
+def test_download_file_trims_preallocation_to_received_bytes(tmp_path: Path) -> None:
+    response = _FakeStreamResponse([b"PK", b"data"], headers={"Content-Length": "4096"})
+    out_path = tmp_path / "gallery.zip"
+
+    filmgrab_scraper._download_file(
+        session=_FakeSession(response),
+        url="https://film-grab.com/gallery.zip",
+        out_path=out_path,
+        timeout=10,
+        referer=None,
+        skip_existing=True,
+    )
+
+    assert out_path.read_bytes() == b"PKdata"
+
+
+def test_download_file_keeps_umask_based_file_mode(tmp_path: Path) -> None:
+    out_path = tmp_path / "gallery.zip"
+
+    filmgrab_scraper._download_file(
+        session=_FakeSession(_FakeStreamResponse([b"PK"])),
+        url="https://film-grab.com/gallery.zip",
+        out_path=out_path,
+        timeout=10,
+        referer=None,
+        skip_existing=True,
+    )
+
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(out_path.stat().st_mode) == 0o666 & ~umask
+
+
+def test_download_file_discards_partial_file_on_error(tmp_path: Path) -> None:
+    session = _FakeSession(_FakeStreamResponse([b"PK", b"data"], fail_after=1))
+    out_path = tmp_path / "gallery.zip"
+
+    with pytest.raises(requests.ConnectionError):
+        filmgrab_scraper._download_file(
+            session=session,
+            url="https://film-grab.com/gallery.zip",
+            out_path=out_path,
+            timeout=10,
+            referer=None,
+            skip_existing=True,
+        )
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_build_session_sizes_connection_pool_for_workers() -> None:
+    session = filmgrab_scraper.build_session(max_workers=6)
+
+    adapter = session.get_adapter("https://film-grab.com/")
+    assert adapter._pool_maxsize == 6
+    assert "filmgrab-scraper" in session.headers["User-Agent"]
+
+
+def test_rate_limiter_only_waits_after_burst(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = {"now": 100.0}
+    sleeps: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock["now"] += seconds
+
+    monkeypatch.setattr(filmgrab_scraper.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(filmgrab_scraper.time, "sleep", fake_sleep)
+
+    limiter = filmgrab_scraper._RateLimiter.from_delays(0.4, 0.6, burst=2)
+    for _ in range(4):
+        limiter.acquire()
+
+    assert limiter.rate == pytest.approx(2.0)
+    assert sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+
+
+def test_rate_limiter_is_disabled_without_delays() -> None:
+    limiter = filmgrab_scraper._RateLimiter.from_delays(0, 0)
+
+    assert limiter.rate == 0
+    limiter.acquire()
@@ -1,10 +1,16 @@
 import sqlite3
+from contextlib import closing
 from pathlib import Path
 
 import pytest
 
+from ai_marketplace_monitor import market_data
 from ai_marketplace_monitor.listing import Listing
-from ai_marketplace_monitor.market_data import MarketDataStore
+from ai_marketplace_monitor.market_data import (
+    _OBSERVATION_FLAGS_SQL,
+    MarketDataStore,
+    _extract_models,
+)
 
 
 def _listing(
@@ -29,7 +35,8 @@ def _listing(
 
 
 def _fetch_one(db_path: Path, sql: str):
-    with sqlite3.connect(db_path) as conn:
+    # read-only, and closed right away so it never holds the file open against the store
+    with closing(sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)) as conn:
         return conn.execute(sql).fetchone()
 
 
@@ -314,256 +321,296 @@ def test_refresh_market_price_supports_detected_model_from_other_search_item(
     assert currency == "$"
 
 
-def test_detects_model_from_description_variants(tmp_path: Path) -> None:
+_DESCRIPTION_VARIANT_CASES = [
+    ("desc-a7sii", "Sony body", "Selling my Sony A7Sii, works perfectly.", "sony_a7sii"),
+    ("title-a7riii", "Sony a7Riii body only", "Body only.", "sony_a7riii"),
+    ("title-a7c", "Sony A7C camera body", "Great condition.", "sony_a7c"),
+    (
+        "desc-a6000",
+        "Mirrorless camera bundle",
+        "Selling my Sony A6000 mirrorless camera. Includes: Sony a6000, Sony tripod and mount.",
+        "sony_a6000",
+    ),
+    ("title-a7-base", "Sony a7 body only", "Works perfectly.", "sony_a7"),
+    ("title-a7r6-typo", "Sony a7r6 body", "Probably meant a7r family.", "sony_a7r"),
+    ("desc-rx1r2", "Sony compact camera", "Sony RX1R II full-frame compact camera.", "sony_rx1r2"),
+    (
+        "desc-a6100",
+        "Sony mirrorless setup",
+        "Includes Sony a6100 body and two batteries.",
+        "sony_a6100",
+    ),
+    (
+        "desc-rx100m7",
+        "Sony compact bundle",
+        "Mint Sony RX100M7 with extra batteries.",
+        "sony_rx100vii",
+    ),
+    ("desc-a9iii", "Sony sports camera", "Selling Sony A9iii body only.", "sony_a9iii"),
+    ("desc-fx30", "Cinema camera", "Sony FX30 in excellent condition.", "sony_fx30"),
+    ("desc-a7rm4", "Mirrorless camera", "Sony A7RM4 body, low shutter count.", "sony_a7riv"),
+    (
+        "ricoh-gr2",
+        "Ricoh GR II street camera",
+        "Compact Ricoh GR2 in great condition.",
+        "ricoh_gr2",
+    ),
+    ("ricoh-gr3", "Ricoh GR III", "Ricoh griii body only.", "ricoh_gr3"),
+    ("ricoh-gr3x", "Ricoh GR3X", "Mint condition griiix.", "ricoh_gr3x"),
+    ("ricoh-gr3-hdf", "Ricoh GR3 HDF", "Latest Ricoh GR3HDF version.", "ricoh_gr3hdf"),
+    ("ricoh-gr3x-hdf", "Ricoh GR3X HDF", "Ricoh GR3XHDF package.", "ricoh_gr3xhdf"),
+    ("ricoh-gr4", "Ricoh GR4 preorder slot", "GR IV mention.", "ricoh_gr4"),
+]
+
+
+@pytest.mark.parametrize(
+    ("listing_id", "title", "description", "expected_model"),
+    _DESCRIPTION_VARIANT_CASES,
+    ids=[case[0] for case in _DESCRIPTION_VARIANT_CASES],
+)
+def test_detects_model_from_description_variants(
+    tmp_path: Path, listing_id: str, title: str, description: str, expected_model: str
+) -> None:
     db_path = tmp_path / "market_data.db"
     store = MarketDataStore(db_path)
 
     store.record_observation(
-        listing=_listing(
-            listing_id="desc-a7sii",
-            price="$900",
-            title="Sony body",
-            description="Selling my Sony A7Sii, works perfectly.",
-        ),
-        item_name="sony_a7c2",
-        search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
-    )
-    store.record_observation(
-        listing=_listing(
-            listing_id="title-a7riii",
-            price="$1100",
-            title="Sony a7Riii body only",
-            description="Body only.",
-        ),
+        listing=_listing(listing_id, "$900", title=title, description=description),
         item_name="sony_a7c2",
         search_city="vancouver",
         search_phrase="sony a7c2",
         availability="all",
     )
+
+    row = _fetch_one(db_path, "SELECT item_name, detected_model FROM listing_observations")
+    assert row == (expected_model, expected_model)
+
+
+def test_extract_models_respects_word_boundaries_and_pattern_order() -> None:
+    assert _extract_models("sony a6400 and ricoh gr iii x") == ["ricoh_gr3x", "sony_a6400"]
+    assert _extract_models("rx100 mark vii kit") == ["sony_rx100vii"]
+    assert _extract_models("xgr3 and a7iiix") == []
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_reclassify_unknown_rows_pages_through_all_rows(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, workers: int
+) -> None:
+    db_path = tmp_path / "market_data.db"
+    store = MarketDataStore(db_path)
+    for index in range(5):
+        store.record_observation(
+            listing=_listing(listing_id=f"page-{index}", price="$1000"),
+            item_name="sony_a7c2",
+            search_city="vancouver",
+            search_phrase="sony a7c2",
+            availability="all",
+        )
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE listing_observations SET classification_reason = NULL")
+
+    monkeypatch.setattr("ai_marketplace_monitor.market_data._RECLASSIFY_BATCH_SIZE", 2)
+    updated = store.reclassify_unknown_rows(workers=workers)
+
+    assert updated == 5
+    assert _fetch_one(
+        db_path,
+        "SELECT COUNT(*) FROM listing_observations WHERE classification_reason IS NULL",
+    ) == (0,)
+
+
+def test_extract_models_skips_text_without_model_characters() -> None:
+    assert _extract_models("vintage leather sofa, pick up only") == []
+    assert _extract_models("ricoh gr iii street camera") == ["ricoh_gr3"]
+
+
+def test_store_reuses_one_connection_until_closed(tmp_path: Path) -> None:
+    store = MarketDataStore(tmp_path / "market_data.db")
+
+    with store._connect() as first:
+        pass
+    with store._connect() as second:
+        pass
+    store.close()
+    with store._connect() as reopened:
+        pass
+
+    assert first is second
+    assert reopened is not first
+    store.close()
+
+
+def test_reclassify_unknown_rows_skips_rows_classified_from_same_text(tmp_path: Path) -> None:
+    db_path = tmp_path / "market_data.db"
+    store = MarketDataStore(db_path)
     store.record_observation(
         listing=_listing(
-            listing_id="title-a7c",
-            price="$1200",
-            title="Sony A7C camera body",
-            description="Great condition.",
+            listing_id="mystery",
+            price="$300",
+            title="Vintage film camera",
+            description="No idea which model this is.",
         ),
         item_name="sony_a7c2",
         search_city="vancouver",
         search_phrase="sony a7c2",
         availability="all",
     )
-    store.record_observation(
-        listing=_listing(
-            listing_id="desc-a6000",
-            price="$700",
-            title="Mirrorless camera bundle",
-            description=(
-                "Selling my Sony A6000 mirrorless camera. Includes: Sony a6000, "
-                "Sony tripod and mount."
+
+    assert store.reclassify_unknown_rows() == 0
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE listing_observations SET description = 'Sony a7c body'")
+    assert store.reclassify_unknown_rows() == 1
+    assert _fetch_one(db_path, "SELECT detected_model FROM listing_observations") == ("sony_a7c",)
+
+
+def test_listing_existence_checks_use_listing_index(tmp_path: Path) -> None:
+    store = MarketDataStore(tmp_path / "market_data.db")
+
+    assert store.observation_flags("facebook", "missing") == (False, False)
+    with store._connect() as conn:
+        plan = conn.execute(
+            f"EXPLAIN QUERY PLAN {_OBSERVATION_FLAGS_SQL}", ("facebook", "missing")
+        ).fetchall()
+    store.close()
+
+    searches = [str(row[-1]) for row in plan if str(row[-1]).startswith("SEARCH")]
+    assert len(searches) == 2
+    assert all("idx_listing_obs_listing" in detail for detail in searches)
+
+
+def test_record_observations_writes_batch_in_one_call(tmp_path: Path) -> None:
+    db_path = tmp_path / "market_data.db"
+    store = MarketDataStore(db_path)
+
+    store.record_observations(
+        [
+            (_listing("batch-1", "$1,800"), "sony_a7c2", "vancouver", "sony a7c2", "all"),
+            (
+                _listing("batch-2", "$1,500", title="Sony A7C", description="Sony A7C body."),
+                "sony_a7c2",
+                "vancouver",
+                "sony a7c2",
+                "out",
             ),
-        ),
-        item_name="sony_a7c2",
-        search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
-    )
-    store.record_observation(
-        listing=_listing(
-            listing_id="title-a7-base",
-            price="$900",
-            title="Sony a7 body only",
-            description="Works perfectly.",
-        ),
-        item_name="sony_a7c2",
-        search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
-    )
-    store.record_observation(
-        listing=_listing(
-            listing_id="title-a7r6-typo",
-            price="$1000",
-            title="Sony a7r6 body",
-            description="Probably meant a7r family.",
-        ),
-        item_name="sony_a7c2",
-        search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
-    )
-    store.record_observation(
-        listing=_listing(
-            listing_id="desc-rx1r2",
-            price="$2300",
-            title="Sony compact camera",
-            description="Sony RX1R II full-frame compact camera.",
-        ),
-        item_name="sony_a7c2",
-        search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
-    )
-    store.record_observation(
-        listing=_listing(
-            listing_id="desc-a6100",
-            price="$850",
-            title="Sony mirrorless setup",
-            description="Includes Sony a6100 body and two batteries.",
-        ),
-        item_name="sony_a7c2",
-        search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
-    )
-    store.record_observation(
-        listing=_listing(
-            listing_id="desc-rx100m7",
-            price="$900",
-            title="Sony compact bundle",
-            description="Mint Sony RX100M7 with extra batteries.",
-        ),
-        item_name="sony_a7c2",
-        search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
-    )
-    store.record_observation(
-        listing=_listing(
-            listing_id="desc-a9iii",
-            price="$4200",
-            title="Sony sports camera",
-            description="Selling Sony A9iii body only.",
-        ),
-        item_name="sony_a7c2",
-        search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
-    )
-    store.record_observation(
-        listing=_listing(
-            listing_id="desc-fx30",
-            price="$1500",
-            title="Cinema camera",
-            description="Sony FX30 in excellent condition.",
-        ),
-        item_name="sony_a7c2",
-        search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
-    )
-    store.record_observation(
-        listing=_listing(
-            listing_id="desc-a7rm4",
-            price="$1800",
-            title="Mirrorless camera",
-            description="Sony A7RM4 body, low shutter count.",
-        ),
-        item_name="sony_a7c2",
-        search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
-    )
-    store.record_observation(
-        listing=_listing(
-            listing_id="ricoh-gr2",
-            price="$700",
-            title="Ricoh GR II street camera",
-            description="Compact Ricoh GR2 in great condition.",
-        ),
-        item_name="sony_a7c2",
-        search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
+        ]
     )
+    store.record_observations([])
+
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute(
+            """
+            SELECT listing_id, item_name, detected_model, availability, sold_time_method
+            FROM listing_observations
+            ORDER BY listing_id
+            """
+        ).fetchall()
+    assert rows == [
+        ("batch-1", "sony_a7c2", "sony_a7c2", "all", None),
+        ("batch-2", "sony_a7c", "sony_a7c", "out", "first_seen_out_of_stock"),
+    ]
+
+
+def test_latest_listing_snapshot_cache_is_invalidated(tmp_path: Path) -> None:
+    db_path = tmp_path / "market_data.db"
+    store = MarketDataStore(db_path)
+    assert store.get_latest_listing_snapshot("facebook", "snap-1") is None
+
     store.record_observation(
-        listing=_listing(
-            listing_id="ricoh-gr3",
-            price="$1000",
-            title="Ricoh GR III",
-            description="Ricoh griii body only.",
-        ),
+        listing=_listing("snap-1", "$1,800"),
         item_name="sony_a7c2",
         search_city="vancouver",
         search_phrase="sony a7c2",
         availability="all",
     )
+    snapshot = store.get_latest_listing_snapshot("facebook", "snap-1")
+    assert snapshot is not None
+    assert snapshot.price == "$1,800"
+    snapshot.price = "changed by caller"
+
+    with closing(sqlite3.connect(db_path)) as conn, conn:
+        conn.execute("UPDATE listing_observations SET price_text = '$1,700'")
+    store.clear_snapshot_cache()
+    refreshed = store.get_latest_listing_snapshot("facebook", "snap-1")
+    assert refreshed is not None
+    assert refreshed.price == "$1,700"
+
+
+def test_observation_flags_reports_out_and_non_out_sightings(tmp_path: Path) -> None:
+    store = MarketDataStore(tmp_path / "market_data.db")
+    assert store.observation_flags("facebook", "flags-1") == (False, False)
+
     store.record_observation(
-        listing=_listing(
-            listing_id="ricoh-gr3x",
-            price="$1100",
-            title="Ricoh GR3X",
-            description="Mint condition griiix.",
-        ),
+        listing=_listing("flags-1", "$1,800"),
         item_name="sony_a7c2",
         search_city="vancouver",
         search_phrase="sony a7c2",
         availability="all",
     )
+    assert store.observation_flags("facebook", "flags-1") == (False, True)
+
     store.record_observation(
-        listing=_listing(
-            listing_id="ricoh-gr3-hdf",
-            price="$1200",
-            title="Ricoh GR3 HDF",
-            description="Latest Ricoh GR3HDF version.",
-        ),
+        listing=_listing("flags-1", "$1,800"),
         item_name="sony_a7c2",
         search_city="vancouver",
         search_phrase="sony a7c2",
-        availability="all",
+        availability="out",
     )
-    store.record_observation(
-        listing=_listing(
-            listing_id="ricoh-gr3x-hdf",
-            price="$1300",
-            title="Ricoh GR3X HDF",
-            description="Ricoh GR3XHDF package.",
-        ),
+    assert store.observation_flags("facebook", "flags-1") == (True, True)
+
+
+def test_refresh_market_price_collects_planner_statistics(tmp_path: Path) -> None:
+    db_path = tmp_path / "market_data.db"
+    store = MarketDataStore(db_path)
+    for listing_id in ("stats-1", "stats-2"):
+        store.record_observation(
+            listing=_listing(listing_id, "$1,800"),
+            item_name="sony_a7c2",
+            search_city="vancouver",
+            search_phrase="sony a7c2",
+            availability="out",
+        )
+
+    store.refresh_market_price(
         item_name="sony_a7c2",
+        marketplace="facebook",
         search_city="vancouver",
-        search_phrase="sony a7c2",
-        availability="all",
+        window_days=30,
     )
+
+    stats = _fetch_one(db_path, "SELECT stat FROM sqlite_stat1 WHERE idx = 'idx_listing_obs_sold'")
+    assert stats is not None
+
+
+def test_has_observation_helpers_agree_with_observation_flags(tmp_path: Path) -> None:
+    store = MarketDataStore(tmp_path / "market_data.db")
+    assert store.has_observation("facebook", "helpers-1") is False
+    assert store.has_non_out_observation("facebook", "helpers-1") is False
+
     store.record_observation(
-        listing=_listing(
-            listing_id="ricoh-gr4",
-            price="$1500",
-            title="Ricoh GR4 preorder slot",
-            description="GR IV mention.",
-        ),
+        listing=_listing("helpers-1", "$1,800"),
         item_name="sony_a7c2",
         search_city="vancouver",
         search_phrase="sony a7c2",
         availability="all",
     )
 
-    rows = []
-    with sqlite3.connect(db_path) as conn:
-        rows = conn.execute(
-            """
-            SELECT listing_id, item_name, detected_model
-            FROM listing_observations
-            ORDER BY listing_id
-            """
-        ).fetchall()
+    assert store.has_observation("facebook", "helpers-1") is True
+    assert store.has_observation("facebook", "helpers-1", "all") is True
+    assert store.has_observation("facebook", "helpers-1", "in") is False
+    assert store.has_observation("facebook", "helpers-1", "out") is False
+    assert store.has_non_out_observation("facebook", "helpers-1") is True
+
+
+def test_shared_store_is_closed_at_exit(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    registered = []
+    monkeypatch.setattr(market_data, "amm_home", tmp_path)
+    monkeypatch.setattr(market_data.atexit, "register", registered.append)
+    market_data.get_market_data_store.cache_clear()
+    try:
+        store = market_data.get_market_data_store()
+        assert market_data.get_market_data_store() is store
+    finally:
+        market_data.get_market_data_store.cache_clear()
 
-    by_id = {row[0]: (row[1], row[2]) for row in rows}
-    assert by_id["desc-a7sii"] == ("sony_a7sii", "sony_a7sii")
-    assert by_id["title-a7riii"] == ("sony_a7riii", "sony_a7riii")
-    assert by_id["title-a7c"] == ("sony_a7c", "sony_a7c")
-    assert by_id["desc-a6000"] == ("sony_a6000", "sony_a6000")
-    assert by_id["title-a7-base"] == ("sony_a7", "sony_a7")
-    assert by_id["title-a7r6-typo"] == ("sony_a7r", "sony_a7r")
-    assert by_id["desc-rx1r2"] == ("sony_rx1r2", "sony_rx1r2")
-    assert by_id["desc-a6100"] == ("sony_a6100", "sony_a6100")
-    assert by_id["desc-rx100m7"] == ("sony_rx100vii", "sony_rx100vii")
-    assert by_id["desc-a9iii"] == ("sony_a9iii", "sony_a9iii")
-    assert by_id["desc-fx30"] == ("sony_fx30", "sony_fx30")
-    assert by_id["desc-a7rm4"] == ("sony_a7riv", "sony_a7riv")
-    assert by_id["ricoh-gr2"] == ("ricoh_gr2", "ricoh_gr2")
-    assert by_id["ricoh-gr3"] == ("ricoh_gr3", "ricoh_gr3")
-    assert by_id["ricoh-gr3x"] == ("ricoh_gr3x", "ricoh_gr3x")
-    assert by_id["ricoh-gr3-hdf"] == ("ricoh_gr3hdf", "ricoh_gr3hdf")
-    assert by_id["ricoh-gr3x-hdf"] == ("ricoh_gr3xhdf", "ricoh_gr3xhdf")
-    assert by_id["ricoh-gr4"] == ("ricoh_gr4", "ricoh_gr4")
+    assert registered == [store.close]